@@ -25,7 +25,20 @@ def create_app():
         # register routes
         from . import routes
         routes.init_app(app)
+        if app.config.get("METRICS_ENABLED"):
+            from .metrics import init_metrics
+            init_metrics(app, db)
         # create tables if missing
         db.create_all()
+        # load the fallback job catalog and its skill index once, not per search
+        from .job_catalog import get_job_catalog
+        get_job_catalog()
+
+    if app.config.get("EMBEDDING_WARMUP"):
+        from .utils import warmup_embedding_model
+        try:
+            warmup_embedding_model(verify=app.config.get("EMBEDDING_VERIFY"))
+        except RuntimeError as e:
+            print("❌ Embedding warmup failed, model will load on first use:", e)
 
     return app
@@ -0,0 +1,232 @@
+"""
+Columnar embedding artifacts written by scripts/generate_embeddings.py, replacing the
+joblib pickles of DataFrame + embeddings.
+
+Layout under Config.DATA_DIR/artifacts/<name> (name = jobs / candidates):
+ - manifest.json            model, dimension, row count, source CSV and column schema
+ - embeddings.npy           float32 matrix (rows x dim), opened with np.memmap
+ - columns/<i>.npy          numeric columns, one value per row
+ - columns/<i>.offsets.npy  text columns: int64 byte offsets (rows + 1) into
+   columns/<i>.data.npy     the UTF-8 bytes of all values concatenated
+
+Opening an artifact reads only the manifest; the embedding matrix and each column are
+mapped the first time they are used, so a script that needs embeddings and one title
+column never touches the rest. A writer builds the new artifact in <name>.tmp and swaps
+it in when done, manifest last.
+"""
+import os, json, shutil
+import numpy as np
+from config import Config
+
+FORMAT_VERSION = 1
+
+
+def artifact_path(name):
+    return os.path.join(Config.DATA_DIR, "artifacts", name)
+
+
+def _column_kind(dtype):
+    """Storage for a pandas dtype: a numpy dtype string for numbers, "text" for everything else."""
+    if isinstance(dtype, np.dtype) and dtype.kind in "biuf":
+        return dtype.newbyteorder("<").str
+    return "text"
+
+
+def merge_schema(schema, df):
+    """Widen schema ({column: kind}) to cover another chunk of the same CSV."""
+    for col, dtype in df.dtypes.items():
+        kind = _column_kind(dtype)
+        seen = schema.get(col, kind)
+        if "text" in (seen, kind):
+            schema[col] = "text"
+        else:
+            schema[col] = np.result_type(np.dtype(seen), np.dtype(kind)).newbyteorder("<").str
+    return schema
+
+
+class Artifact:
+    def __init__(self, root):
+        self.root = root
+        with open(os.path.join(root, "manifest.json"), encoding="utf8") as f:
+            self.manifest = json.load(f)
+        if self.manifest.get("format") != FORMAT_VERSION:
+            raise ValueError(f"{root}: unsupported artifact format {self.manifest.get('format')!r}")
+        self._schema = {c["name"]: c for c in self.manifest["columns"]}
+        self._embeddings = None
+        self._maps = {}
+
+    def __len__(self):
+        return self.manifest["rows"]
+
+    @property
+    def model(self):
+        return self.manifest["model"]
+
+    @property
+    def dim(self):
+        return self.manifest["dim"]
+
+    @property
+    def source(self):
+        return self.manifest.get("source")
+
+    @property
+    def columns(self):
+        return [c["name"] for c in self.manifest["columns"]]
+
+    @property
+    def embeddings(self):
+        if self._embeddings is None:
+            self._embeddings = np.load(os.path.join(self.root, "embeddings.npy"), mmap_mode="r")
+        return self._embeddings
+
+    def _map(self, filename):
+        if filename not in self._maps:
+            self._maps[filename] = np.load(os.path.join(self.root, "columns", filename), mmap_mode="r")
+        return self._maps[filename]
+
+    def _spec(self, name):
+        if name not in self._schema:
+            raise KeyError(f"{self.root}: no column {name!r}")
+        return self._schema[name]
+
+    def has_column(self, name):
+        return name in self._schema
+
+    def column(self, name, rows=None):
+        """
+        Values of one column: a read-only array for numeric columns, a list of str for
+        text columns. rows (a slice or index array) limits which values are decoded.
+        """
+        spec = self._spec(name)
+        if spec["kind"] != "text":
+            values = self._map(f"{spec['file']}.npy")
+            return values if rows is None else values[rows]
+        offsets = self._map(f"{spec['file']}.offsets.npy")
+        data = self._map(f"{spec['file']}.data.npy")
+        if rows is None:
+            rows = slice(0, len(self))
+        if isinstance(rows, slice):
+            start, stop, step = rows.indices(len(self))
+            if step == 1:
+                # one read for the whole range, then split the bytes in memory
+                stop = max(start, stop)
+                bounds = np.asarray(offsets[start:stop + 1]) - offsets[start]
+                blob = data[offsets[start]:offsets[stop]].tobytes()
+                return [blob[a:b].decode("utf8") for a, b in zip(bounds[:-1].tolist(), bounds[1:].tolist())]
+            rows = range(start, stop, step)
+        return [bytes(data[offsets[i]:offsets[i + 1]]).decode("utf8") for i in rows]
+
+    def text(self, name, row):
+        return self.column(name, [row])[0]
+
+    def frame(self, columns=None, rows=None):
+        """A pandas DataFrame of the given columns (default: all)."""
+        import pandas as pd
+        columns = self.columns if columns is None else [c for c in columns if c in self._schema]
+        if rows is None:
+            index = None
+        elif isinstance(rows, slice):
+            index = range(*rows.indices(len(self)))
+        else:
+            index = np.asarray(rows)
+        return pd.DataFrame({c: self.column(c, rows) for c in columns}, index=index)
+
+
+def open_artifact(name_or_path):
+    """Open an artifact by name (jobs / candidates) or directory; reads only the manifest."""
+    root = name_or_path if os.path.isdir(name_or_path) else artifact_path(name_or_path)
+    return Artifact(root)
+
+
+class ArtifactWriter:
+    """
+    Streams rows into a new artifact. schema ({column: kind}) and the row count must be
+    known up front, so the CSV is scanned once (merge_schema) before writing.
+    """
+
+    def __init__(self, root, rows, dim, schema, model=None, source=None):
+        self.root = root
+        self.tmp = root + ".tmp"
+        self.rows = rows
+        self.written = 0
+        self.dim = dim
+        self.schema = dict(schema)
+        self.model = model or Config.EMBEDDING_MODEL
+        self.source = source
+        shutil.rmtree(self.tmp, ignore_errors=True)
+        os.makedirs(os.path.join(self.tmp, "columns"))
+        self.embeddings = np.lib.format.open_memmap(
+            os.path.join(self.tmp, "embeddings.npy"), mode="w+", dtype=np.float32, shape=(rows, dim))
+        self._numeric, self._offsets, self._data, self._data_size = {}, {}, {}, {}
+        for i, (col, kind) in enumerate(self.schema.items()):
+            path = os.path.join(self.tmp, "columns", str(i))
+            if kind == "text":
+                self._offsets[col] = np.lib.format.open_memmap(
+                    path + ".offsets.npy", mode="w+", dtype="<i8", shape=(rows + 1,))
+                self._offsets[col][0] = 0
+                self._data[col] = open(path + ".data.bin", "wb")
+                self._data_size[col] = 0
+            else:
+                self._numeric[col] = np.lib.format.open_memmap(
+                    path + ".npy", mode="w+", dtype=np.dtype(kind), shape=(rows,))
+
+    def append(self, df, vectors):
+        start, stop = self.written, self.written + len(df)
+        if stop > self.rows or len(vectors) != len(df):
+            raise ValueError(f"append of {len(df)} rows / {len(vectors)} vectors at row {start} of {self.rows}")
+        self.embeddings[start:stop] = vectors
+        for col, kind in self.schema.items():
+            if col not in df.columns:
+                raise ValueError(f"chunk is missing column {col!r}")
+            if kind == "text":
+                blobs = [v.encode("utf8") for v in df[col].fillna("").astype(str)]
+                lengths = np.fromiter((len(b) for b in blobs), dtype=np.int64, count=len(blobs))
+                self._offsets[col][start + 1:stop + 1] = self._data_size[col] + np.cumsum(lengths)
+                self._data[col].write(b"".join(blobs))
+                self._data_size[col] += int(lengths.sum())
+            else:
+                self._numeric[col][start:stop] = df[col].to_numpy(dtype=np.dtype(kind))
+        self.written = stop
+
+    def close(self):
+        if self.written != self.rows:
+            raise ValueError(f"artifact has {self.written} of {self.rows} rows")
+        self.embeddings.flush()
+        columns = []
+        for i, (col, kind) in enumerate(self.schema.items()):
+            path = os.path.join(self.tmp, "columns", str(i))
+            if kind == "text":
+                self._offsets[col].flush()
+                self._data[col].close()
+                # wrap the raw bytes in an .npy header so the column maps like the others
+                with open(path + ".data.npy", "wb") as out, open(path + ".data.bin", "rb") as raw:
+                    np.lib.format.write_array_header_1_0(
+                        out, {"descr": "|u1", "fortran_order": False, "shape": (self._data_size[col],)})
+                    shutil.copyfileobj(raw, out, 1 << 20)
+                os.remove(path + ".data.bin")
+            else:
+                self._numeric[col].flush()
+            columns.append({"name": str(col), "kind": kind, "file": str(i)})
+        manifest = {
+            "format": FORMAT_VERSION, "model": self.model, "dim": self.dim, "rows": self.rows,
+            "source": self.source, "columns": columns,
+        }
+        self._numeric = self._offsets = self.embeddings = None
+        with open(os.path.join(self.tmp, "manifest.json"), "w", encoding="utf8") as f:
+            json.dump(manifest, f, indent=1)
+        old = self.root + ".old"
+        shutil.rmtree(old, ignore_errors=True)
+        if os.path.exists(self.root):
+            os.replace(self.root, old)
+        os.replace(self.tmp, self.root)
+        shutil.rmtree(old, ignore_errors=True)
+        return Artifact(self.root)
+
+
+def write_artifact(root, df, embeddings, model=None, source=None):
+    """Write a whole DataFrame + embedding matrix at once (e.g. converting an old pickle)."""
+    embeddings = np.asarray(embeddings, dtype=np.float32)
+    writer = ArtifactWriter(root, len(df), embeddings.shape[1], merge_schema({}, df), model, source)
+    writer.append(df, embeddings)
+    return writer.close()
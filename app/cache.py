@@ -0,0 +1,169 @@
+"""
+Content-addressed cache for extracted resume text and embeddings.
+
+Two tiers: an in-process LRU dict in front of files under Config.CACHE_DIR/<namespace>.
+Keys are hashes of the content itself (file bytes, normalized text + model name), so
+duplicate uploads and repeated job descriptions skip PDF parsing and SBERT encoding, and
+changing EMBEDDING_MODEL naturally misses old entries. The disk tier is trimmed to
+CACHE_MAX_BYTES by deleting the least recently used files.
+"""
+import os, io, hashlib, threading
+from collections import OrderedDict
+import numpy as np
+from config import Config
+
+
+def sha256_file(path, chunk=1 << 20):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def text_key(text, model_name):
+    normalized = " ".join((text or "").split())
+    return hashlib.sha256(f"{model_name}\0{normalized}".encode("utf8")).hexdigest()
+
+
+class ContentCache:
+    def __init__(self, namespace, dump, load, max_items=None, max_bytes=None, root=None):
+        self.namespace = namespace
+        self.dump, self.load = dump, load
+        self.max_items = max_items if max_items is not None else Config.CACHE_MEMORY_ITEMS
+        self.max_bytes = max_bytes if max_bytes is not None else Config.CACHE_MAX_BYTES
+        self.dir = os.path.join(root or Config.CACHE_DIR, namespace)
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_bytes = None
+        self.counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+
+    def _path(self, key):
+        return os.path.join(self.dir, key[:2], key)
+
+    def _remember(self, key, value):
+        with self._lock:
+            self._memory[key] = value
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_items:
+                self._memory.popitem(last=False)
+
+    def get(self, key):
+        with self._lock:
+            if key in self._memory:
+                self._memory.move_to_end(key)
+                self.counters["memory_hits"] += 1
+                return self._memory[key]
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                value = self.load(f.read())
+            os.utime(path)  # mark as recently used for eviction
+        except (OSError, ValueError):
+            with self._lock:
+                self.counters["misses"] += 1
+            return None
+        with self._lock:
+            self.counters["disk_hits"] += 1
+        self._remember(key, value)
+        return value
+
+    def put(self, key, value):
+        self._remember(key, value)
+        if self.max_bytes <= 0:
+            return
+        data = self.dump(value)
+        path = self._path(key)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp = f"{path}.{os.getpid()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except OSError:
+            return
+        with self._lock:
+            if self._disk_bytes is None:
+                self._disk_bytes = self._scan_size()
+            else:
+                self._disk_bytes += len(data)
+            over = self._disk_bytes > self.max_bytes
+        if over:
+            self._evict()
+
+    def _files(self):
+        for dirpath, _, names in os.walk(self.dir):
+            for name in names:
+                if not name.endswith(".tmp"):
+                    yield os.path.join(dirpath, name)
+
+    def _scan_size(self):
+        total = 0
+        for path in self._files():
+            try:
+                total += os.path.getsize(path)
+            except OSError:
+                pass
+        return total
+
+    def _evict(self):
+        """Delete least recently used files until the tier is at 90% of its budget."""
+        entries = []
+        for path in self._files():
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+        entries.sort()
+        total = sum(size for _, size, _ in entries)
+        target = int(self.max_bytes * 0.9)
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            with self._lock:
+                self.counters["evictions"] += 1
+        with self._lock:
+            self._disk_bytes = total
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+            stats["memory_items"] = len(self._memory)
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_ratio"] = round((lookups - stats["misses"]) / lookups, 4) if lookups else 0.0
+        return stats
+
+
+# ---------------------------------------------------------------
+# Caches used by app.utils
+# ---------------------------------------------------------------
+def _dump_array(arr):
+    buf = io.BytesIO()
+    np.save(buf, np.asarray(arr), allow_pickle=False)
+    return buf.getvalue()
+
+def _load_array(data):
+    return np.load(io.BytesIO(data), allow_pickle=False)
+
+_CACHES = {}
+_caches_lock = threading.Lock()
+
+def get_cache(namespace):
+    with _caches_lock:
+        if namespace not in _CACHES:
+            if namespace == "text":
+                _CACHES[namespace] = ContentCache("text", lambda s: s.encode("utf8"), lambda b: b.decode("utf8"))
+            elif namespace == "embeddings":
+                _CACHES[namespace] = ContentCache("embeddings", _dump_array, _load_array)
+            else:
+                raise KeyError(namespace)
+        return _CACHES[namespace]
+
+def cache_stats():
+    return {name: cache.stats() for name, cache in _CACHES.items()}
@@ -0,0 +1,97 @@
+"""
+Column-projected candidate access for scoring.
+
+Scoring reads only id, skills, qualification and experience per candidate (plus the resume
+text in matcher mode, or to embed the few resumes missing from the vector index).
+iter_candidate_batches selects just those columns as plain rows and streams them from one
+server-side cursor (stream_results + yield_per), so the resume text, embedding blob and
+file columns are never fetched, no ORM objects enter the session, and the whole pool is
+never in memory at once. Each CandidateBatch parses skills_json once; a request that
+scores several jobs passes every batch to all of them.
+
+The scorable filter (non-empty resume text) is matched by the partial index
+ix_candidates_scorable, so counting and scanning scorable candidates never reads the
+resume text.
+"""
+import json
+from . import db
+from .models import Candidate
+from .matcher import token_set
+
+SCORING_COLUMNS = (Candidate.id, Candidate.skills_json, Candidate.qualification, Candidate.experience_years)
+# a literal '' (not a bound parameter) so the planner can match the partial index
+SCORABLE = (Candidate.resume_text.isnot(None), Candidate.resume_text != db.literal_column("''"))
+IN_CHUNK = 5000
+
+
+def _parse_skills(value):
+    try:
+        return json.loads(value or "[]")
+    except ValueError:
+        return [s.strip() for s in (value or "").split(",") if s.strip()]
+
+
+class CandidateBatch:
+    """Decoded scoring inputs for a batch of candidates, aligned by position."""
+    __slots__ = ("ids", "skills", "qualifications", "experience", "texts", "_token_sets")
+
+    def __init__(self, rows, with_text=False):
+        self.ids = [r.id for r in rows]
+        self.skills = [_parse_skills(r.skills_json) for r in rows]
+        self.qualifications = [r.qualification or "unknown" for r in rows]
+        self.experience = [r.experience_years or 0 for r in rows]
+        self.texts = [r.resume_text for r in rows] if with_text else None
+        self._token_sets = None
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def token_sets(self):
+        if self._token_sets is None:
+            self._token_sets = [token_set(t) for t in self.texts]
+        return self._token_sets
+
+    def features(self):
+        """The dict scoring.score_job expects."""
+        return {
+            "embeddings": None,
+            "texts": self.texts,
+            "token_sets": self.token_sets if self.texts is not None else None,
+            "skills": self.skills,
+            "qualifications": self.qualifications,
+            "experience": self.experience,
+        }
+
+    def resume_texts(self, positions):
+        """Resume texts at the given positions, fetched by id when the batch has none loaded."""
+        if self.texts is not None:
+            return [self.texts[i] for i in positions]
+        ids = [self.ids[i] for i in positions]
+        found = dict(db.session.execute(
+            db.select(Candidate.id, Candidate.resume_text).where(Candidate.id.in_(ids))
+        ).all())
+        return [found.get(cand_id) or "" for cand_id in ids]
+
+
+def count_scorable():
+    return db.session.execute(db.select(db.func.count(Candidate.id)).where(*SCORABLE)).scalar()
+
+
+def iter_candidate_batches(batch_size, candidate_ids=None, with_text=False):
+    """
+    CandidateBatches of scorable candidates in id order: all of them from one streamed
+    query, or only candidate_ids, looked up IN_CHUNK ids per query.
+    """
+    columns = SCORING_COLUMNS + ((Candidate.resume_text,) if with_text else ())
+    query = db.select(*columns).where(*SCORABLE).order_by(Candidate.id)
+    if candidate_ids is None:
+        result = db.session.execute(query.execution_options(stream_results=True, yield_per=batch_size))
+        for rows in result.partitions():
+            yield CandidateBatch(rows, with_text)
+        return
+    ids = sorted(candidate_ids)
+    for start in range(0, len(ids), IN_CHUNK):
+        rows = db.session.execute(query.where(Candidate.id.in_(ids[start:start + IN_CHUNK]))).all()
+        for lo in range(0, len(rows), batch_size):
+            yield CandidateBatch(rows[lo:lo + batch_size], with_text)
@@ -1,71 +1,209 @@
 import requests
+from requests.adapters import HTTPAdapter
 from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor, wait
 import urllib.parse
+import threading
+import time
 import re
+from config import Config
+from .metrics import timed
 
-def crawl_jobs(skills, location, qualification=None):
+# Shared keep-alive session; the adapter pool is sized for the crawler's concurrency
+_session = None
+_session_lock = threading.Lock()
+_host_slots = {}
+
+def get_session():
+    global _session
+    with _session_lock:
+        if _session is None:
+            _session = requests.Session()
+            _session.headers.update({"User-Agent": "Mozilla/5.0"})
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=Config.CRAWLER_WORKERS)
+            _session.mount("http://", adapter)
+            _session.mount("https://", adapter)
+        return _session
+
+def _host_slot(url):
+    """Per-host semaphore so one site never sees more than CRAWLER_PER_HOST requests at once."""
+    host = urllib.parse.urlsplit(url).netloc
+    with _session_lock:
+        if host not in _host_slots:
+            _host_slots[host] = threading.BoundedSemaphore(Config.CRAWLER_PER_HOST)
+        return _host_slots[host]
+
+
+def search_urls(skills, location, qualification=None, pages=None, base_url=None):
     """
-    Fetch real Naukri job postings based on skills, location, and qualification.
-    Only returns genuine job listing URLs (skips sponsored/redirect/fake entries).
+    Result pages for the full query and each individual skill, in every location, as
+    (url, location, page-1 url, page number); the page-1 url names the result series.
     """
-    query_parts = [skills, qualification]
-    query = " ".join([q for q in query_parts if q])
-    if not query:
-        return []
+    base_url = (base_url or Config.CRAWLER_BASE_URL).rstrip("/")
+    pages = pages or Config.CRAWLER_PAGES
+    skill_list = [s.strip() for s in (skills or "").split(",") if s.strip()]
+    queries = [" ".join(q for q in [skills, qualification] if q)]
+    if len(skill_list) > 1:
+        queries += [" ".join(q for q in [s, qualification] if q) for s in skill_list]
+    queries = [q for q in dict.fromkeys(queries) if q][:Config.CRAWLER_MAX_QUERIES]
+    locations = [l.strip() for l in (location or "").split(",") if l.strip()] or [""]
 
-    q = urllib.parse.quote_plus(query)
-    l = urllib.parse.quote_plus(location or "")
-    search_url = f"https://www.naukri.com/{q}-jobs-in-{l}"
+    urls = []
+    for query in queries:
+        q = urllib.parse.quote_plus(query)
+        for loc in locations:
+            l = urllib.parse.quote_plus(loc)
+            first = f"{base_url}/{q}-jobs-in-{l}"
+            for page in range(1, pages + 1):
+                suffix = f"-{page}" if page > 1 else ""
+                urls.append((first + suffix, loc, first, page))
+    return urls
 
-    headers = {"User-Agent": "Mozilla/5.0"}
+
+def parse_job_cards(html, base_url, location):
+    """Genuine job listings from one result page (skips sponsored/redirect/fake entries)."""
+    soup = BeautifulSoup(html, "html.parser")
     jobs = []
+    for a in soup.select("a.title"):
+        title = a.get_text(strip=True)
+        href = a.get("href", "")
 
-    try:
-        res = requests.get(search_url, headers=headers, timeout=10)
-        res.raise_for_status()
-        soup = BeautifulSoup(res.text, "html.parser")
+        if not title or not href:
+            continue
 
-        job_cards = soup.select("a.title")
-        seen = set()
+        # ensure it's a full URL
+        if href.startswith("/"):
+            href = urllib.parse.urljoin(base_url, href)
 
-        for a in job_cards:
-            title = a.get_text(strip=True)
-            href = a.get("href", "")
+        # only include real job links from the crawled site
+        if not href.startswith(base_url + "/") or not re.search(r"/job-listings[-/]", href):
+            continue
 
-            if not title or not href:
-                continue
+        jobs.append({
+            "title": title,
+            "company": "Naukri.com",
+            "location": location,
+            "summary": "Live job from Naukri",
+            "url": href
+        })
+    return jobs
 
-            # ensure it's a full URL
-            if href.startswith("/"):
-                href = urllib.parse.urljoin("https://www.naukri.com", href)
 
-            # only include real Naukri job links
-            if not href.startswith("https://www.naukri.com/") or not re.search(r"/job-listings[-/]", href):
-                continue
+class _SeriesEnds:
+    """The first page found past the end of each result series, shared by one crawl's workers."""
+    def __init__(self):
+        self._ends = {}
+        self._lock = threading.Lock()
 
-            if href in seen:
-                continue
+    def past_end(self, series, page):
+        with self._lock:
+            return page >= self._ends.get(series, page + 1)
+
+    def mark(self, series, page):
+        with self._lock:
+            self._ends[series] = min(page, self._ends.get(series, page))
+
+
+def _fetch_and_parse(url, location, base_url, deadline, series=None, page=1, ends=None):
+    """
+    Job cards of one result page; None when the page is past the end of its series (a
+    404 or an empty page after the first), so later pages of that series are not requested.
+    """
+    ends = ends or _SeriesEnds()
+    if ends.past_end(series, page):
+        return None
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        return []
+    with _host_slot(url):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return []
+        if ends.past_end(series, page):
+            return None
+        res = get_session().get(url, timeout=min(Config.CRAWLER_TIMEOUT, remaining))
+        if res.status_code == 404 and page > 1:
+            ends.mark(series, page)
+            return None
+        res.raise_for_status()
+        html = res.text
+    # parsing runs in the worker thread, outside the host slot
+    jobs = parse_job_cards(html, base_url, location)
+    if not jobs and page > 1:
+        ends.mark(series, page)
+        return None
+    return jobs
 
-            seen.add(href)
-            jobs.append({
-                "title": title,
-                "company": "Naukri.com",
-                "location": location,
-                "summary": "Live job from Naukri",
-                "url": href
-            })
 
-        print(f"✅ Found {len(jobs)} real job postings on Naukri for '{query}' in '{location}'.")
+_executor = None
 
-    except Exception as e:
-        print("❌ Naukri crawler error:", e)
+def _get_executor():
+    global _executor
+    with _session_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=Config.CRAWLER_WORKERS, thread_name_prefix="crawler")
+        return _executor
 
-    # fallback if none found
-    if not jobs:
-        jobs.append({
-            "title": f"{skills} Jobs in {location}",
-            "company": "Naukri",
-            "url": search_url
-        })
 
+@timed("crawl_jobs")
+def crawl_jobs(skills, location, qualification=None, pages=None, base_url=None, deadline=None, report=None):
+    """
+    Fetch real Naukri job postings based on skills, location, and qualification.
+    Several result pages and skill/location combinations are fetched concurrently through a
+    pooled keep-alive session; whatever has arrived when the overall deadline passes is used.
+    Only returns genuine job listing URLs (skips sponsored/redirect/fake entries); an empty
+    list when nothing was found. A 404 or empty page after the first ends that query's
+    results: it is not an error and the pages after it are skipped. A report dict, if
+    given, receives the number of pages requested, failed, cut off by the deadline and
+    past the end of their results.
+    """
+    base_url = (base_url or Config.CRAWLER_BASE_URL).rstrip("/")
+    query = " ".join([q for q in [skills, qualification] if q])
+    if not query:
+        return []
+
+    urls = search_urls(skills, location, qualification, pages, base_url)
+    end = time.monotonic() + (deadline or Config.CRAWLER_DEADLINE)
+    ends = _SeriesEnds()
+    futures = [_get_executor().submit(_fetch_and_parse, url, loc, base_url, end, series, page, ends)
+               for url, loc, series, page in urls]
+    wait(futures, timeout=max(0, end - time.monotonic()))
+
+    jobs, seen, errors, timeouts, exhausted = [], set(), 0, 0, 0
+    for future in futures:
+        if not future.done():
+            future.cancel()
+            timeouts += 1
+            continue
+        try:
+            page_jobs = future.result()
+        except Exception as e:
+            errors += 1
+            print("❌ Naukri crawler error:", e)
+            continue
+        if page_jobs is None:
+            exhausted += 1
+            continue
+        for job in page_jobs:
+            if job["url"] in seen:
+                continue
+            seen.add(job["url"])
+            jobs.append(job)
+
+    print(f"✅ Found {len(jobs)} real job postings on Naukri for '{query}' in '{location}' "
+          f"({len(urls)} pages, {errors} errors, {timeouts} timed out, {exhausted} past the last page).")
+    if report is not None:
+        report.update(pages=len(urls), errors=errors, timeouts=timeouts, exhausted=exhausted)
     return jobs
+
+
+def placeholder_job(skills, location, qualification=None, base_url=None):
+    """A link to the Naukri search itself, shown when neither the crawl nor the catalog has jobs."""
+    base_url = (base_url or Config.CRAWLER_BASE_URL).rstrip("/")
+    q = urllib.parse.quote_plus(" ".join([q for q in [skills, qualification] if q]))
+    l = urllib.parse.quote_plus(location or "")
+    return {
+        "title": f"{skills} Jobs in {location}",
+        "company": "Naukri",
+        "url": f"{base_url}/{q}-jobs-in-{l}"
+    }
@@ -0,0 +1,177 @@
+"""
+Embedding model backends, selected with Config.EMBEDDING_BACKEND:
+ - torch: the reference SentenceTransformer in full precision
+ - int8:  the same model with its Linear layers dynamically quantized to int8 (CPU only)
+ - onnx:  sentence-transformers' ONNX Runtime backend, optionally with a quantized
+          model file (EMBEDDING_ONNX_FILE, e.g. onnx/model_qint8_avx512_vnni.onnx)
+Every backend exposes encode(texts, convert_to_tensor=False, **kwargs) like SentenceTransformer.
+"""
+import numpy as np
+from config import Config
+
+VERIFY_TEXTS = [
+    "Senior Python developer with 5 years of Django and PostgreSQL experience.",
+    "B.Tech graduate skilled in Java, Spring Boot and microservices.",
+    "Data scientist: machine learning, NLP, PyTorch, TensorFlow, SQL.",
+    "Looking for a frontend engineer with React, TypeScript and CSS.",
+    "MBA with experience in project management and stakeholder communication.",
+]
+
+
+def set_threads(n):
+    """Limit intra-op CPU threads so several workers on one node don't oversubscribe cores."""
+    if not n:
+        return
+    import torch
+    torch.set_num_threads(n)
+
+
+class TorchBackend:
+    name = "torch"
+
+    def __init__(self, model_name):
+        from sentence_transformers import SentenceTransformer
+        self.model_name = model_name
+        self.model = SentenceTransformer(model_name, device="cpu")
+
+    def encode(self, texts, convert_to_tensor=False, **kwargs):
+        return self.model.encode(texts, convert_to_tensor=convert_to_tensor, **kwargs)
+
+    @property
+    def tokenizer(self):
+        return self.model.tokenizer
+
+    @property
+    def max_seq_length(self):
+        return self.model.max_seq_length
+
+
+class Int8Backend(TorchBackend):
+    name = "int8"
+
+    def __init__(self, model_name):
+        super().__init__(model_name)
+        import torch
+        self.model = torch.quantization.quantize_dynamic(self.model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+class OnnxBackend(TorchBackend):
+    name = "onnx"
+
+    def __init__(self, model_name):
+        from sentence_transformers import SentenceTransformer
+        self.model_name = model_name
+        model_kwargs = {"file_name": Config.EMBEDDING_ONNX_FILE} if Config.EMBEDDING_ONNX_FILE else None
+        self.model = SentenceTransformer(model_name, device="cpu", backend="onnx", model_kwargs=model_kwargs)
+
+
+BACKENDS = {b.name: b for b in (TorchBackend, Int8Backend, OnnxBackend)}
+
+
+def load_backend(name=None, model_name=None):
+    name = (name or Config.EMBEDDING_BACKEND).lower()
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown embedding backend {name!r}; choose from {sorted(BACKENDS)}")
+    set_threads(Config.EMBEDDING_THREADS)
+    return BACKENDS[name](model_name or Config.EMBEDDING_MODEL)
+
+
+def verify_backend(backend, reference, texts=None, tolerance=None):
+    """
+    Compare a backend against the reference model. Returns (ok, report) where report holds
+    the lowest per-text cosine between the two and the largest difference between their
+    pairwise similarity matrices; ok means both are within tolerance.
+    """
+    texts = texts or VERIFY_TEXTS
+    tolerance = Config.EMBEDDING_VERIFY_TOLERANCE if tolerance is None else tolerance
+    a = np.asarray(backend.encode(texts), dtype=np.float64)
+    b = np.asarray(reference.encode(texts), dtype=np.float64)
+    a /= np.linalg.norm(a, axis=1, keepdims=True)
+    b /= np.linalg.norm(b, axis=1, keepdims=True)
+    min_cos = float((a * b).sum(axis=1).min())
+    max_sim_diff = float(np.abs(a @ a.T - b @ b.T).max())
+    report = {"backend": backend.name, "min_cosine": round(min_cos, 5), "max_similarity_diff": round(max_sim_diff, 5)}
+    return (1.0 - min_cos) <= tolerance and max_sim_diff <= tolerance, report
+
+
+# ---------------------------------------------------------------
+# Token-budgeted batching
+# ---------------------------------------------------------------
+def _token_ids(model, texts):
+    tokenizer = getattr(model, "tokenizer", None)
+    if tokenizer is None:
+        return None
+    return tokenizer(list(texts), add_special_tokens=False, truncation=False,
+                     return_attention_mask=False)["input_ids"]
+
+
+def plan_batches(lengths, token_budget):
+    """
+    Group item indices into batches sorted by length, so that
+    len(batch) * longest item in the batch (the padded size) stays within token_budget.
+    """
+    order = sorted(range(len(lengths)), key=lambda i: lengths[i])
+    batches, batch, longest = [], [], 0
+    for i in order:
+        longest_if_added = max(longest, lengths[i])
+        if batch and (len(batch) + 1) * longest_if_added > token_budget:
+            batches.append(batch)
+            batch, longest_if_added = [], lengths[i]
+        batch.append(i)
+        longest = longest_if_added
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+def encode_batched(model, texts, token_budget=None, pool_long=None, progress=None):
+    """
+    Encode texts with length-sorted batches under a token budget and return them in input
+    order. Texts longer than the model window are split into window-sized chunks whose
+    embeddings are averaged (weighted by chunk length) and re-normalized when the model
+    emits unit vectors. Models without a tokenizer fall back to a plain encode call.
+    """
+    token_budget = token_budget or Config.EMBEDDING_TOKEN_BUDGET
+    pool_long = Config.EMBEDDING_POOL_LONG if pool_long is None else pool_long
+    texts = list(texts)
+    ids = _token_ids(model, texts)
+    if ids is None or not texts:
+        return np.asarray(model.encode(texts, convert_to_tensor=False))
+
+    window = max(8, int(getattr(model, "max_seq_length", 256) or 256) - 2)  # room for [CLS]/[SEP]
+    pieces, owners, weights = [], [], []
+    for t, (text, tok_ids) in enumerate(zip(texts, ids)):
+        if pool_long and len(tok_ids) > window:
+            for start in range(0, len(tok_ids), window):
+                chunk = tok_ids[start:start + window]
+                pieces.append(model.tokenizer.decode(chunk))
+                owners.append(t)
+                weights.append(len(chunk))
+        else:
+            pieces.append(text)
+            owners.append(t)
+            weights.append(max(1, min(len(tok_ids), window)))
+
+    vectors = [None] * len(pieces)
+    for batch in plan_batches([w + 2 for w in weights], token_budget):
+        encoded = model.encode([pieces[i] for i in batch], batch_size=len(batch), convert_to_tensor=False)
+        for i, v in zip(batch, encoded):
+            vectors[i] = np.asarray(v, dtype=np.float32)
+        if progress:
+            progress(len(batch))
+
+    parts = {}
+    for owner, w, v in zip(owners, weights, vectors):
+        parts.setdefault(owner, []).append((w, v))
+    normalized = all(abs(float(np.linalg.norm(v)) - 1.0) < 1e-3 for v in vectors)
+    out = np.zeros((len(texts), vectors[0].shape[0]), dtype=np.float32)
+    for owner, chunk_vectors in parts.items():
+        if len(chunk_vectors) == 1:
+            out[owner] = chunk_vectors[0][1]
+            continue
+        total = sum(w for w, _ in chunk_vectors)
+        vec = sum(w * v for w, v in chunk_vectors) / total
+        if normalized:
+            vec /= np.linalg.norm(vec)
+        out[owner] = vec
+    return out
@@ -0,0 +1,184 @@
+"""
+Resume ingestion pipeline.
+
+upload_cv only saves the file and creates a pending Candidate. A local process pool does
+the CPU-heavy work (PDF text extraction, feature extraction, SBERT embedding) and a single
+finalizer thread in the web process stores the result, appends to the vector index and
+scores the candidate against all jobs. INGEST_QUEUE_SIZE bounds queued + running uploads.
+Uploads are saved under a unique name, so two files with the same name never share a path.
+A candidate still pending INGEST_TIMEOUT seconds after upload (its job was lost in a
+restart, or hangs) is reported failed by ingest_timed_out instead of pending forever.
+"""
+import os, json, time, uuid, threading, traceback
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import numpy as np
+from config import Config
+from . import db
+from .models import Candidate
+from .utils import (
+    clean_text, extract_text_from_file, extract_name_email, extract_features,
+    embed_texts, encode_embedding, warmup_embedding_model
+)
+from .vector_index import get_candidate_index
+from .scoring import score_candidate_against_jobs
+from .skill_index import set_candidate_skills
+
+
+# ---------------------------------------------------------------
+# Work done per resume (runs in a worker process)
+# ---------------------------------------------------------------
+def process_resume(path):
+    """Extract everything needed for a Candidate row; returns plain picklable data."""
+    resume_text = clean_text(extract_text_from_file(path))
+    name, email = extract_name_email(resume_text)
+    emb = embed_texts([resume_text])[0] if resume_text else None
+    return {
+        "resume_text": resume_text,
+        "name": clean_text(name),
+        "email": clean_text(email),
+        "features": extract_features(resume_text),
+        "embedding": np.asarray(emb, dtype=np.float32) if emb is not None else None,
+    }
+
+
+def _init_worker(warmup):
+    if warmup:
+        try:
+            warmup_embedding_model()
+        except RuntimeError as e:
+            print("❌ Embedding warmup failed in ingest worker:", e)
+
+
+def _apply_result(candidate, result):
+    """Write extracted data to the candidate and its skill rows; the caller commits."""
+    features = result["features"]
+    candidate.name = result["name"]
+    candidate.email = result["email"]
+    candidate.resume_text = result["resume_text"]
+    candidate.skills_json = json.dumps(features["skills"])
+    candidate.qualification = features["qualification"]
+    candidate.experience_years = features["experience_years"]
+    candidate.embedding = encode_embedding(result["embedding"])
+    candidate.ingest_status = "done"
+    candidate.ingest_error = None
+    set_candidate_skills(candidate.id, features["skills"])
+
+
+def store_result(candidate, result):
+    """
+    Write extracted data to the candidate and score it, committed together: a scoring
+    failure leaves no "done" candidate without score rows. Then index it.
+    """
+    if result["resume_text"]:
+        score_candidate_against_jobs(candidate, result["embedding"],
+                                     apply=lambda: _apply_result(candidate, result))
+    else:
+        _apply_result(candidate, result)
+        db.session.commit()
+    get_candidate_index().append(candidate.id, result["embedding"])
+    return candidate
+
+
+def upload_path(upload_dir, filename):
+    """A new path for an uploaded file, prefixed so concurrent uploads with one name don't collide."""
+    return os.path.join(upload_dir, f"{uuid.uuid4().hex[:12]}_{filename}")
+
+
+def ingest_timed_out(candidate, now=None):
+    """True for a pending candidate whose upload is older than INGEST_TIMEOUT (or unstamped)."""
+    if candidate.ingest_status != "pending":
+        return False
+    queued_at = candidate.ingest_queued_at
+    return queued_at is None or (now or time.time()) - queued_at > Config.INGEST_TIMEOUT
+
+
+def mark_failed(candidate, error):
+    """Roll back a failed ingestion and record the error on the candidate."""
+    db.session.rollback()
+    print("❌ Resume ingestion failed:", candidate.resume_path, error)
+    traceback.print_exc()
+    candidate.ingest_status = "failed"
+    candidate.ingest_error = str(error)[:1000]
+    db.session.commit()
+    return candidate
+
+
+def ingest_resume(path, candidate=None):
+    """
+    Synchronous ingestion, used when INGEST_WORKERS is 0 and by scripts. Like the queue,
+    a failure leaves the candidate "failed" with ingest_error instead of raising.
+    """
+    candidate = candidate or Candidate(resume_path=path, ingest_status="pending", ingest_queued_at=time.time())
+    if candidate.id is None:
+        # committed first, like an upload, so a rollback on failure keeps the row
+        db.session.add(candidate)
+        db.session.commit()
+    try:
+        return store_result(candidate, process_resume(path))
+    except Exception as e:
+        return mark_failed(candidate, e)
+
+
+# ---------------------------------------------------------------
+# Background queue
+# ---------------------------------------------------------------
+class IngestQueue:
+    def __init__(self, app, workers, max_pending):
+        self.app = app
+        self.workers = workers
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._pool = None
+        self._finalizer = ThreadPoolExecutor(max_workers=1, thread_name_prefix="ingest-finalize")
+        self._lock = threading.Lock()
+
+    def _get_pool(self):
+        with self._lock:
+            if self._pool is None:
+                # spawn: workers must not inherit the web process's DB connections or threads
+                self._pool = ProcessPoolExecutor(max_workers=self.workers,
+                                                 mp_context=multiprocessing.get_context("spawn"),
+                                                 initializer=_init_worker,
+                                                 initargs=(self.app.config.get("EMBEDDING_WARMUP"),))
+            return self._pool
+
+    def reserve(self):
+        """Claim a queue slot; False means the queue is full and the caller should back off."""
+        return self._slots.acquire(blocking=False)
+
+    def release(self):
+        self._slots.release()
+
+    def submit(self, candidate_id, path):
+        """Queue a reserved upload. The slot is released once the result is stored."""
+        future = self._get_pool().submit(process_resume, path)
+        future.add_done_callback(lambda f: self._finalizer.submit(self._finish, candidate_id, f))
+
+    def _finish(self, candidate_id, future):
+        try:
+            with self.app.app_context():
+                candidate = db.session.get(Candidate, candidate_id)
+                if candidate is None:
+                    return
+                try:
+                    store_result(candidate, future.result())
+                except Exception as e:
+                    mark_failed(candidate, e)
+        finally:
+            self.release()
+
+    def shutdown(self):
+        if self._pool is not None:
+            self._pool.shutdown(wait=True)
+        self._finalizer.shutdown(wait=True)
+
+
+_queue_lock = threading.Lock()
+
+def get_ingest_queue(app):
+    with _queue_lock:
+        queue = app.extensions.get("ingest_queue")
+        if queue is None:
+            queue = IngestQueue(app, app.config["INGEST_WORKERS"], app.config["INGEST_QUEUE_SIZE"])
+            app.extensions["ingest_queue"] = queue
+        return queue
@@ -0,0 +1,167 @@
+"""
+Fallback job catalog used by search_jobs when the live crawl finds nothing.
+
+The CSV (Config.JOB_CATALOG_CSV, e.g. job_title_des.csv) is read once, every row's skills
+are extracted through the skill map, and an inverted index skill -> row numbers is kept
+in memory. A search counts, per row, how many of the requested skills it has and returns
+the top k; an optional precomputed embedding matrix (<csv>.embeddings.npy, one row per
+CSV row, or else the "jobs" artifact from scripts/generate_embeddings.py when it was built
+from the same CSV) breaks ties by similarity to a query embedding. The catalog reloads
+itself when the CSV's mtime changes.
+"""
+import os, threading
+import numpy as np
+from config import Config
+from .artifacts import open_artifact
+from .utils import get_skill_matcher, clean_text
+
+
+def _column(df, *names):
+    for name in names:
+        if name in df.columns:
+            return df[name].fillna("").astype(str).tolist()
+    return [""] * len(df)
+
+
+class JobCatalog:
+    def __init__(self, csv_path=None):
+        self.csv_path = csv_path or Config.JOB_CATALOG_CSV
+        self.embeddings_path = os.path.splitext(self.csv_path)[0] + ".embeddings.npy"
+        self.jobs = []
+        self.postings = {}
+        self.embeddings = None
+        self.mtime = None
+        self._lock = threading.Lock()
+
+    def _load(self, mtime):
+        import pandas as pd
+        df = pd.read_csv(self.csv_path)
+        df.columns = [str(c).strip().lower().replace(" ", "_") for c in df.columns]
+        titles = _column(df, "job_title", "title")
+        descriptions = _column(df, "job_description", "description")
+        companies = _column(df, "company")
+        urls = _column(df, "url")
+
+        matcher = get_skill_matcher()
+        jobs, postings = [], {}
+        for row, (title, desc, company, url) in enumerate(zip(titles, descriptions, companies, urls)):
+            skills = matcher.find(f"{title} {desc}")
+            for skill in skills:
+                postings.setdefault(skill, []).append(row)
+            jobs.append({
+                "title": clean_text(title),
+                "company": clean_text(company),
+                "summary": clean_text(desc)[:300],
+                "url": url or "#",
+                "skills": skills,
+            })
+
+        embeddings = None
+        if os.path.exists(self.embeddings_path):
+            embeddings = np.load(self.embeddings_path, mmap_mode="r")
+            if embeddings.shape[0] != len(jobs):
+                print(f"❌ Ignoring {self.embeddings_path}: {embeddings.shape[0]} rows for {len(jobs)} jobs")
+                embeddings = None
+        else:
+            embeddings = self._artifact_embeddings(len(jobs))
+
+        self.jobs = jobs
+        self.postings = {s: np.asarray(rows, dtype=np.int32) for s, rows in postings.items()}
+        self.embeddings = embeddings
+        self.mtime = mtime
+        print(f"✅ Loaded fallback job catalog: {len(jobs)} jobs, {len(self.postings)} skills")
+
+    def _artifact_embeddings(self, n_jobs):
+        try:
+            art = open_artifact("jobs")
+        except (OSError, ValueError):
+            return None
+        if art.source != os.path.abspath(self.csv_path) or len(art) != n_jobs or art.model != Config.EMBEDDING_MODEL:
+            return None
+        return art.embeddings
+
+    def refresh(self):
+        """Load or reload the CSV if its mtime changed; a missing file leaves an empty catalog."""
+        try:
+            mtime = os.stat(self.csv_path).st_mtime
+        except OSError:
+            mtime = None
+        if mtime == self.mtime:
+            return
+        with self._lock:
+            if mtime == self.mtime:
+                return
+            if mtime is None:
+                self.jobs, self.postings, self.embeddings, self.mtime = [], {}, None, None
+                return
+            try:
+                self._load(mtime)
+            except Exception as e:
+                print("❌ Could not load fallback job catalog:", e)
+                self.mtime = mtime
+
+    def search(self, skills, k=None, query_emb=None):
+        """
+        Top-k jobs by number of requested skills they mention; none when no requested skill
+        is in the catalog. skills is the raw comma separated input; it goes through the same
+        skill map as the catalog rows. Jobs tied at the cut-off are picked by similarity to
+        query_emb, the query's embedding or a function returning it: it is only computed
+        when such a tie exists and the catalog has embeddings.
+        """
+        self.refresh()
+        k = k or Config.JOB_CATALOG_TOP_K
+        jobs, postings = self.jobs, self.postings
+        if not jobs:
+            return []
+        wanted = set(get_skill_matcher().find(skills))
+        wanted |= {s.strip().lower() for s in (skills or "").split(",") if s.strip()}
+        lists = [postings[s] for s in wanted if s in postings]
+        if not lists:
+            return []
+
+        counts = np.zeros(len(jobs), dtype=np.int32)
+        for rows in lists:
+            counts[rows] += 1
+        q = None
+
+        # counts are small integers, so walk them from the best level down instead of sorting
+        top = []
+        for level in range(len(lists), 0, -1):
+            rows = np.flatnonzero(counts == level)
+            if len(rows) > k - len(top) and query_emb is not None and self.embeddings is not None:
+                if q is None:
+                    q = np.asarray(query_emb() if callable(query_emb) else query_emb, dtype=np.float32)
+                    q = q / (np.linalg.norm(q) or 1.0)
+                vecs = np.asarray(self.embeddings[rows], dtype=np.float32)
+                sims = (vecs @ q) / np.maximum(np.linalg.norm(vecs, axis=1), 1e-12)
+                rows = rows[np.argsort(-sims, kind="stable")]
+            top.extend(rows[:k - len(top)].tolist())
+            if len(top) >= k:
+                break
+        return [jobs[i] for i in top]
+
+    def build_embeddings(self, batch=256):
+        """Embed every catalog row (title + summary) and save the matrix next to the CSV."""
+        from .utils import embed_texts
+        self.refresh()
+        texts = [f"{j['title']} {j['summary']}" for j in self.jobs]
+        parts = [np.asarray(embed_texts(texts[i:i + batch]), dtype=np.float32) for i in range(0, len(texts), batch)]
+        matrix = np.vstack(parts) if parts else np.zeros((0, Config.EMBEDDING_DIM), dtype=np.float32)
+        matrix /= np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+        tmp = self.embeddings_path + ".tmp.npy"
+        np.save(tmp, matrix)
+        os.replace(tmp, self.embeddings_path)
+        self.embeddings = np.load(self.embeddings_path, mmap_mode="r")
+        return matrix.shape
+
+
+_CATALOG = None
+_catalog_lock = threading.Lock()
+
+def get_job_catalog():
+    global _CATALOG
+    with _catalog_lock:
+        if _CATALOG is None:
+            _CATALOG = JobCatalog()
+    _CATALOG.refresh()
+    return _CATALOG
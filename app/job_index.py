@@ -0,0 +1,245 @@
+"""
+In-memory job features for candidate-side recommendations.
+
+Every stored job is kept as one row of a unit-normalized float32 embedding matrix plus
+vectorized skill, qualification and experience columns:
+ - skills: posting lists skill -> row numbers and the number of skills per job, so a
+   candidate's skill overlap with every job is a few array additions
+ - qualification: integer codes into a small table of distinct values
+ - experience: float array of required years
+Jobs are only ever inserted, so the matrix is synced by loading rows with an id above the
+last one seen (an index lookup on max(id), no table scan). Deleted jobs are skipped when
+the recommended rows are read back and cause a full reload on the next request. Scripts
+that rewrite stored job features in place stamp Job.features_updated_at; a newer max
+stamp (also an index lookup) reloads everything.
+
+Jobs switched to the trained matcher (Job.scoring_mode, which can change at any time) are
+looked up per request and rescored with the model, so a job ranks the candidate the same
+way it is ranked on that job's shortlist.
+"""
+import json, threading
+import numpy as np
+from config import Config
+from . import db
+from .models import Job
+from .utils import decode_embedding, weighted_scores, qualification_scores, experience_scores
+from .matcher import get_matcher, token_set, job_token_set, token_overlap_ratios
+
+_INITIAL_CAPACITY = 1024
+
+
+class JobFeatures:
+    def __init__(self, dim=None):
+        self.dim = dim or Config.EMBEDDING_DIM
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.count = 0
+        self.max_id = 0
+        self.features_stamp = None
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.vectors = np.zeros((0, self.dim), dtype=np.float32)
+        self.skill_counts = np.zeros(0, dtype=np.int32)
+        self.qual_codes = np.zeros(0, dtype=np.int16)
+        self.experience = np.zeros(0, dtype=np.float64)
+        self.postings = {}
+        self.posting_arrays = {}
+        self.qualifications = []
+        self._stale = False
+
+    def invalidate(self):
+        """Reload everything on the next sync (e.g. after jobs were deleted)."""
+        self._stale = True
+
+    def _grow(self, needed):
+        """Reallocate the column arrays; a snapshot taken before keeps the old arrays."""
+        capacity = max(_INITIAL_CAPACITY, len(self.ids))
+        while capacity < needed:
+            capacity *= 2
+        if capacity == len(self.ids):
+            return
+
+        def grown(arr, shape):
+            out = np.zeros(shape, dtype=arr.dtype)
+            out[:self.count] = arr[:self.count]
+            return out
+        self.ids = grown(self.ids, capacity)
+        self.vectors = grown(self.vectors, (capacity, self.dim))
+        self.skill_counts = grown(self.skill_counts, capacity)
+        self.qual_codes = grown(self.qual_codes, capacity)
+        self.experience = grown(self.experience, capacity)
+
+    def _append(self, rows):
+        self._grow(self.count + len(rows))
+        qual_index = {q: i for i, q in enumerate(self.qualifications)}
+        touched = set()
+        for r in rows:
+            i = self.count
+            vec = decode_embedding(r.embedding)
+            if vec is not None and len(vec) == self.dim:
+                norm = float(np.linalg.norm(vec))
+                self.vectors[i] = vec / norm if norm > 0 else 0.0
+            skills = set(json.loads(r.skills_required or "[]"))
+            for skill in skills:
+                self.postings.setdefault(skill, []).append(i)
+            touched |= skills
+            qual = r.qualification or "unknown"
+            if qual not in qual_index:
+                qual_index[qual] = len(self.qualifications)
+                self.qualifications.append(qual)
+            self.ids[i] = r.id
+            self.skill_counts[i] = len(skills)
+            self.qual_codes[i] = qual_index[qual]
+            self.experience[i] = r.experience_years or 0
+            self.count += 1
+            self.max_id = max(self.max_id, r.id)
+        # replace (never mutate) the arrays so earlier snapshots stay consistent
+        self.posting_arrays = dict(self.posting_arrays)
+        for skill in touched:
+            self.posting_arrays[skill] = np.asarray(self.postings[skill], dtype=np.int32)
+
+    def sync(self, batch_size=5000):
+        """Bring the matrix up to date with the jobs table."""
+        max_id, stamp = db.session.execute(db.select(
+            db.select(db.func.max(Job.id)).scalar_subquery(),
+            db.select(db.func.max(Job.features_updated_at)).scalar_subquery(),
+        )).one()
+        max_id = max_id or 0
+        with self._lock:
+            if self._stale or stamp != self.features_stamp:
+                self._reset()
+                self.features_stamp = stamp
+            while self.max_id < max_id:
+                rows = db.session.execute(
+                    db.select(Job.id, Job.skills_required, Job.qualification, Job.experience_years, Job.embedding)
+                    .where(Job.id > self.max_id).order_by(Job.id).limit(batch_size)
+                ).all()
+                if not rows:
+                    break
+                self._append(rows)
+            return self._snapshot()
+
+    def _snapshot(self):
+        n = self.count
+        return {
+            "ids": self.ids[:n],
+            "vectors": self.vectors[:n],
+            "skill_counts": self.skill_counts[:n],
+            "qual_codes": self.qual_codes[:n],
+            "experience": self.experience[:n],
+            "postings": self.posting_arrays,
+            "qualifications": list(self.qualifications),
+        }
+
+
+def _embedding_similarity(vectors, cand_emb):
+    """Cosine similarity of the candidate to unit-normalized job rows."""
+    n = len(vectors)
+    if cand_emb is None or not n:
+        return np.zeros(n)
+    q = np.asarray(cand_emb, dtype=np.float32)
+    norm = float(np.linalg.norm(q))
+    return (vectors @ (q / norm)).astype(np.float64) if norm > 0 else np.zeros(n)
+
+
+def score_jobs_for_candidate(snapshot, cand_emb, cand_skills, cand_qual, cand_exp):
+    """Scores and per-component contributions of one candidate against every job in the snapshot."""
+    n = len(snapshot["ids"])
+    emb_sim = _embedding_similarity(snapshot["vectors"], cand_emb)
+
+    overlap = np.zeros(n, dtype=np.float64)
+    for skill in set(cand_skills or []):
+        rows = snapshot["postings"].get(skill)
+        if rows is not None:
+            overlap[rows] += 1
+    skill_ratio = overlap / np.maximum(snapshot["skill_counts"], 1)
+
+    qual_table = qualification_scores(cand_qual or "unknown", snapshot["qualifications"] or ["unknown"])
+    qual = qual_table[snapshot["qual_codes"]] if n else np.zeros(0)
+    exp = experience_scores(cand_exp or 0, snapshot["experience"])
+    return weighted_scores(emb_sim, skill_ratio, qual, exp)
+
+
+def apply_matcher_scores(snapshot, scores, cand_emb, cand_text):
+    """
+    Replace the fixed-weight scores of jobs in "matcher" mode by the model's, in place.
+    Without a model file those jobs were scored with the weights too, so nothing changes.
+    """
+    if get_matcher().model() is None:
+        return scores
+    jobs = db.session.execute(
+        db.select(Job.id, Job.title, Job.description).where(Job.scoring_mode == "matcher")
+    ).all()
+    ids = snapshot["ids"]
+    rows, job_tokens = [], []
+    for job in jobs:
+        i = int(np.searchsorted(ids, job.id))
+        # jobs added since the snapshot was taken are not ranked yet
+        if i < len(ids) and ids[i] == job.id:
+            rows.append(i)
+            job_tokens.append(job_token_set(job.title, job.description))
+    if rows:
+        cand_tokens = token_set(cand_text)
+        ratios = [token_overlap_ratios(tokens, [cand_tokens])[0] for tokens in job_tokens]
+        emb_sim = _embedding_similarity(snapshot["vectors"][rows], cand_emb)
+        scores[rows] = get_matcher().predict(emb_sim, ratios)
+    return scores
+
+
+def top_k(scores, k):
+    """Indices of the k highest scores, best first (ties by position)."""
+    k = min(k, len(scores))
+    if k <= 0:
+        return np.zeros(0, dtype=np.int64)
+    if k < len(scores):
+        part = np.argpartition(-scores, k - 1)[:k]
+    else:
+        part = np.arange(len(scores))
+    return part[np.lexsort((part, -scores[part]))]
+
+
+_FEATURES = None
+_features_lock = threading.Lock()
+
+def get_job_features():
+    global _FEATURES
+    with _features_lock:
+        if _FEATURES is None:
+            _FEATURES = JobFeatures()
+        return _FEATURES
+
+
+def recommend_jobs(candidate, k=None, cand_emb=None):
+    """
+    Best k stored jobs for one candidate, as a list of dicts with the job, its score in
+    percent and the component breakdown (percentage points, like the shortlist).
+    """
+    k = k or Config.RECOMMEND_TOP_K
+    if cand_emb is None:
+        cand_emb = decode_embedding(candidate.embedding)
+    features = get_job_features()
+    snapshot = features.sync()
+    scores, breakdown = score_jobs_for_candidate(
+        snapshot, cand_emb, candidate.skill_list(),
+        candidate.qualification, candidate.experience_years
+    )
+    apply_matcher_scores(snapshot, scores, cand_emb, candidate.resume_text)
+    best = top_k(scores, k)
+    job_ids = [int(snapshot["ids"][i]) for i in best]
+    jobs = {j.id: j for j in Job.query.options(db.defer(Job.embedding)).filter(Job.id.in_(job_ids))}
+    results = []
+    for i, job_id in zip(best, job_ids):
+        job = jobs.get(job_id)
+        if job is None:
+            features.invalidate()
+            continue
+        results.append({
+            "job": job,
+            "score": round(float(scores[i]) * 100, 2),
+            "skills_match": float(breakdown["skills"][i]),
+            "qualification_match": float(breakdown["qualification"][i]),
+            "experience_match": float(breakdown["experience"][i]),
+            "embedding_match": float(breakdown["embedding"][i]),
+        })
+    return results
@@ -0,0 +1,90 @@
+"""
+Serving the model trained by scripts/train_matcher.py (matcher_rf.pkl).
+
+The model sees the same two features it was trained on: embedding cosine similarity and
+the share of the job's first 200 tokens (title + description) that also appear in the
+first 200 tokens of the resume. It is loaded once per process and reloaded when the
+pickle's mtime changes; predictions for a whole batch of candidates are one predict call.
+
+SCORING_MODE (or the shortlist's mode switch) picks "weights" (compute_match_score's
+fixed weights) or "matcher" for a job; the mode a job was scored with is kept on the job.
+"""
+import os, threading
+import numpy as np
+from config import Config
+
+MODES = ("weights", "matcher")
+TOKEN_LIMIT = 200
+
+
+def token_set(text, limit=TOKEN_LIMIT):
+    return set((text or "").lower().split()[:limit])
+
+
+def job_token_set(title, description):
+    return token_set(f"{title or ''} {description or ''}")
+
+
+def token_overlap_ratios(job_tokens, cand_token_sets):
+    """Share of the job's tokens found in each candidate's tokens (train_matcher's skill_ratio)."""
+    size = max(1, len(job_tokens))
+    return np.asarray([len(job_tokens.intersection(c)) / size for c in cand_token_sets], dtype=np.float64)
+
+
+class Matcher:
+    def __init__(self, path=None):
+        self.path = path or Config.MATCHER_MODEL_PATH
+        self._model = None
+        self._mtime = None
+        self._lock = threading.Lock()
+
+    def model(self):
+        """The current model, reloading it if the file changed; None if there is no usable file."""
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            return self._model
+        if mtime != self._mtime:
+            with self._lock:
+                if mtime != self._mtime:
+                    try:
+                        import joblib
+                        self._model = joblib.load(self.path)
+                        print(f"✅ Loaded matcher model from {self.path}")
+                    except Exception as e:
+                        # a half-written file: keep serving the previous model
+                        print("❌ Could not load matcher model:", e)
+                    self._mtime = mtime
+        return self._model
+
+    def predict(self, emb_sim, token_ratio):
+        """Scores in 0..1 for aligned feature arrays, rounded like compute_match_score."""
+        model = self.model()
+        if model is None:
+            raise RuntimeError(f"No matcher model at {self.path}")
+        X = np.column_stack([np.asarray(emb_sim, dtype=np.float64), np.asarray(token_ratio, dtype=np.float64)])
+        if not len(X):
+            return np.zeros(0)
+        return np.round(np.clip(model.predict(X), 0.0, 1.0), 4)
+
+
+_MATCHER = None
+_matcher_lock = threading.Lock()
+
+def get_matcher():
+    global _MATCHER
+    with _matcher_lock:
+        if _MATCHER is None:
+            _MATCHER = Matcher()
+        return _MATCHER
+
+
+def resolve_mode(mode=None):
+    """A valid scoring mode; "matcher" falls back to "weights" when no model is available."""
+    mode = (mode or Config.SCORING_MODE or "weights").lower()
+    if mode not in MODES:
+        mode = "weights"
+    if mode == "matcher" and get_matcher().model() is None:
+        print("❌ Matcher model not available, scoring with fixed weights")
+        mode = "weights"
+    return mode
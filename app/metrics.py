@@ -0,0 +1,213 @@
+"""
+Lightweight timing instrumentation and Prometheus text exposition.
+
+timed("stage") works as a decorator or a context manager and records the duration into a
+per-stage histogram. SQL statements and session commits are timed through SQLAlchemy
+events. /metrics renders everything in the Prometheus text format. With
+METRICS_TIMING_HEADER (or an X-Debug-Timing: 1 request header) each response also
+carries a Server-Timing header with that request's per-stage totals and query count.
+Per-request SQL statement counts are also kept per endpoint, to spot N+1 query patterns.
+Streamed responses (the CSV export) are recorded when the response is closed, so their
+latency and query count include the body; they carry no Server-Timing header, which
+would have to be sent before the body runs.
+
+Metrics are per process: work done inside the ingest pool's worker processes is not
+visible here, only the parts that run in the web process.
+"""
+import time, threading, functools
+from flask import g, has_request_context, request
+
+# seconds; covers regex work (~us) up to slow crawls and model loads
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# SQL statements per request; the upper buckets catch N+1 query patterns
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250, 500, 1000)
+
+
+class Histogram:
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.sum += value
+        self.count += 1
+
+
+_lock = threading.Lock()
+_stages = {}      # stage -> Histogram
+_requests = {}    # endpoint -> Histogram
+_request_queries = {}  # endpoint -> Histogram of SQL statements per request
+_counters = {"sql_queries": 0, "requests": 0}
+
+
+def observe(stage, seconds):
+    with _lock:
+        hist = _stages.get(stage)
+        if hist is None:
+            hist = _stages[stage] = Histogram()
+        hist.observe(seconds)
+    if has_request_context():
+        breakdown = g.setdefault("stage_times", {})
+        breakdown[stage] = breakdown.get(stage, 0.0) + seconds
+
+
+class timed:
+    """Time a block (with timed("stage"): ...) or every call of a function (@timed("stage"))."""
+    def __init__(self, stage):
+        self.stage = stage
+        self._starts = threading.local()
+
+    def __enter__(self):
+        stack = getattr(self._starts, "stack", None)
+        if stack is None:
+            stack = self._starts.stack = []
+        stack.append(time.perf_counter())
+        return self
+
+    def __exit__(self, *exc):
+        observe(self.stage, time.perf_counter() - self._starts.stack.pop())
+        return False
+
+    def __call__(self, fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                observe(self.stage, time.perf_counter() - start)
+        return wrapper
+
+
+# ---------------------------------------------------------------
+# SQLAlchemy hooks
+# ---------------------------------------------------------------
+def _before_cursor(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+def _after_cursor(conn, cursor, statement, parameters, context, executemany):
+    observe("sql_query", time.perf_counter() - conn.info["query_start"].pop())
+    with _lock:
+        _counters["sql_queries"] += 1
+    if has_request_context():
+        g.sql_queries = g.get("sql_queries", 0) + 1
+
+def _on_error(context):
+    # a failed statement never reaches after_cursor_execute: drop its start time
+    conn = context.connection
+    if conn is not None and conn.info.get("query_start"):
+        conn.info["query_start"].pop()
+
+def _before_commit(session):
+    session.info["commit_start"] = time.perf_counter()
+
+def _after_commit(session):
+    start = session.info.pop("commit_start", None)
+    if start is not None:
+        observe("db_commit", time.perf_counter() - start)
+
+
+def install_db_hooks(db):
+    """Attach the query and commit timers; call inside an app context."""
+    from sqlalchemy import event
+    from sqlalchemy.orm import Session
+    if not event.contains(db.engine, "before_cursor_execute", _before_cursor):
+        event.listen(db.engine, "before_cursor_execute", _before_cursor)
+        event.listen(db.engine, "after_cursor_execute", _after_cursor)
+        event.listen(db.engine, "handle_error", _on_error)
+    if not event.contains(Session, "before_commit", _before_commit):
+        event.listen(Session, "before_commit", _before_commit)
+        event.listen(Session, "after_commit", _after_commit)
+
+
+# ---------------------------------------------------------------
+# Flask integration
+# ---------------------------------------------------------------
+def _start_request():
+    g.request_start = time.perf_counter()
+
+
+def _record_request(endpoint, elapsed, sql_queries):
+    with _lock:
+        hist = _requests.get(endpoint)
+        if hist is None:
+            hist = _requests[endpoint] = Histogram()
+        hist.observe(elapsed)
+        queries = _request_queries.get(endpoint)
+        if queries is None:
+            queries = _request_queries[endpoint] = Histogram(QUERY_BUCKETS)
+        queries.observe(sql_queries)
+        _counters["requests"] += 1
+
+
+def _finish_request(response, app):
+    start = g.get("request_start")
+    if start is None:
+        return response
+    endpoint = request.endpoint or "unknown"
+    if response.is_streamed:
+        # the body and its queries run after this hook (stream_with_context keeps g)
+        request_g = g._get_current_object()
+        response.call_on_close(lambda: _record_request(
+            endpoint, time.perf_counter() - start, request_g.get("sql_queries", 0)))
+        return response
+    elapsed = time.perf_counter() - start
+    _record_request(endpoint, elapsed, g.get("sql_queries", 0))
+    if app.config.get("METRICS_TIMING_HEADER") or request.headers.get("X-Debug-Timing") == "1":
+        parts = [f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in g.get("stage_times", {}).items()]
+        parts.append(f'sql;desc="{g.get("sql_queries", 0)} queries"')
+        parts.append(f"total;dur={elapsed * 1000:.1f}")
+        response.headers["Server-Timing"] = ", ".join(parts)
+    return response
+
+
+def init_metrics(app, db):
+    install_db_hooks(db)
+    app.before_request(_start_request)
+    app.after_request(lambda response: _finish_request(response, app))
+
+
+def _render_histogram(lines, name, label, series):
+    for key, hist in sorted(series.items()):
+        cumulative = 0
+        for bound, count in zip(hist.buckets, hist.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{label}="{key}",le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_bucket{{{label}="{key}",le="+Inf"}} {hist.count}')
+        lines.append(f'{name}_sum{{{label}="{key}"}} {hist.sum:.6f}')
+        lines.append(f'{name}_count{{{label}="{key}"}} {hist.count}')
+
+
+def render_metrics():
+    """All metrics in the Prometheus text exposition format (version 0.0.4)."""
+    with _lock:
+        lines = [
+            "# HELP smartcv_stage_seconds Time spent per processing stage.",
+            "# TYPE smartcv_stage_seconds histogram",
+        ]
+        _render_histogram(lines, "smartcv_stage_seconds", "stage", _stages)
+        lines += [
+            "# HELP smartcv_http_request_seconds Request latency per endpoint.",
+            "# TYPE smartcv_http_request_seconds histogram",
+        ]
+        _render_histogram(lines, "smartcv_http_request_seconds", "endpoint", _requests)
+        lines += [
+            "# HELP smartcv_http_request_sql_queries SQL statements executed per request.",
+            "# TYPE smartcv_http_request_sql_queries histogram",
+        ]
+        _render_histogram(lines, "smartcv_http_request_sql_queries", "endpoint", _request_queries)
+        lines += [
+            "# HELP smartcv_sql_queries_total SQL statements executed.",
+            "# TYPE smartcv_sql_queries_total counter",
+            f"smartcv_sql_queries_total {_counters['sql_queries']}",
+            "# HELP smartcv_http_requests_total Requests served.",
+            "# TYPE smartcv_http_requests_total counter",
+            f"smartcv_http_requests_total {_counters['requests']}",
+        ]
+    return "\n".join(lines) + "\n"
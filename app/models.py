@@ -6,11 +6,22 @@ class Candidate(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     name = db.Column(db.String(255))
     email = db.Column(db.String(255))
-    qualification = db.Column(db.String(255))
+    qualification = db.Column(db.String(255))   # normalized level, see utils.extract_features
+    experience_years = db.Column(db.Integer)
     skills_json = db.Column(db.Text)       # JSON string of skills
     resume_path = db.Column(db.String(1024))
     resume_text = db.Column(db.Text)
-    embedding = db.Column(db.PickleType)  # optional embedding stored as pickled array
+    embedding = db.Column(db.LargeBinary)  # optional embedding, see utils.encode_embedding
+    ingest_status = db.Column(db.String(16))  # pending / done / failed, NULL for older rows
+    ingest_error = db.Column(db.Text)
+    ingest_queued_at = db.Column(db.Float)  # time.time() of the upload, see ingest.ingest_timed_out
+
+    __table_args__ = (
+        # candidates with resume text, the pool every job is scored against (app.candidate_data)
+        db.Index("ix_candidates_scorable", "id",
+                 sqlite_where=db.text("resume_text IS NOT NULL AND resume_text != ''"),
+                 postgresql_where=db.text("resume_text IS NOT NULL AND resume_text != ''")),
+    )
 
     def skill_list(self):
         try:
@@ -18,6 +29,16 @@ class Candidate(db.Model):
         except Exception:
             return [s.strip() for s in (self.skills_json or "").split(",") if s.strip()]
 
+class CandidateSkill(db.Model):
+    """Posting list: one row per (canonical skill, candidate), see app.skill_index."""
+    __tablename__ = "candidate_skills"
+    skill = db.Column(db.String(255), primary_key=True)
+    candidate_id = db.Column(db.Integer, db.ForeignKey("candidates.id"), primary_key=True)
+
+    __table_args__ = (
+        db.Index("ix_candidate_skills_candidate", "candidate_id"),
+    )
+
 class Job(db.Model):
     __tablename__ = "jobs"
     id = db.Column(db.Integer, primary_key=True)
@@ -25,7 +46,16 @@ class Job(db.Model):
     company = db.Column(db.String(255))
     description = db.Column(db.Text)
     skills_required = db.Column(db.Text)   # JSON string of skills
-    embedding = db.Column(db.PickleType)
+    qualification = db.Column(db.String(255))
+    experience_years = db.Column(db.Integer)
+    embedding = db.Column(db.LargeBinary)
+    scoring_mode = db.Column(db.String(16))  # weights / matcher, see app.matcher; NULL = weights
+    scoring_version = db.Column(db.Integer)  # SCORING_VERSION of the last full scoring, see app.scoring
+    features_updated_at = db.Column(db.Float)  # time.time() of the last in-place feature rewrite, see app.job_index
+
+    __table_args__ = (
+        db.Index("ix_jobs_features_updated", "features_updated_at"),
+    )
 
     def skill_list(self):
         try:
@@ -38,7 +68,18 @@ class Application(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     candidate_id = db.Column(db.Integer, db.ForeignKey("candidates.id"))
     job_id = db.Column(db.Integer, db.ForeignKey("jobs.id"))
-    match_score = db.Column(db.Float)
+    match_score = db.Column(db.Float)          # 0..1, see utils.compute_match_score
+    skills_score = db.Column(db.Float)         # component contributions in percentage points
+    qualification_score = db.Column(db.Float)
+    experience_score = db.Column(db.Float)
+    embedding_score = db.Column(db.Float)
+    scoring_version = db.Column(db.Integer)
+
+    __table_args__ = (
+        db.Index("uq_applications_job_candidate", "job_id", "candidate_id", unique=True),
+        db.Index("ix_applications_job_score", "job_id", "match_score"),
+        db.Index("ix_applications_candidate", "candidate_id"),
+    )
 
     candidate = db.relationship("Candidate", backref=db.backref("applications", lazy="dynamic"))
     job = db.relationship("Job", backref=db.backref("applications", lazy="dynamic"))
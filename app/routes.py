@@ -1,25 +1,22 @@
-import os, json, pandas as pd, re, requests, numpy as np
-from bs4 import BeautifulSoup
-from flask import render_template, request, redirect, url_for, flash, Response
+import os, json, time
+from flask import render_template, request, redirect, url_for, flash, Response, stream_with_context
 from werkzeug.utils import secure_filename
 from . import db
 from .models import Candidate, Job
-from .utils import (
-    load_skill_aliases, extract_skills_from_text, embed_texts,
-    compute_match_score, extract_text_from_pdf, extract_name_email
+from .utils import load_skill_aliases, embed_texts, extract_features, encode_embedding, clean_text
+from .search_cache import get_search_cache
+from .crawler import placeholder_job
+from .job_catalog import get_job_catalog
+from .job_index import recommend_jobs
+from .scoring import (
+    score_job_against_candidates, refresh_stale_scores,
+    ranking_page, result_row, export_rows
 )
-from .crawler import crawl_jobs
-
-
-# ---------------------------------------------------------------
-# Helper function to clean text
-# ---------------------------------------------------------------
-def clean_text(s):
-    if s is None:
-        return ""
-    if isinstance(s, bytes):
-        s = s.decode("utf-8", errors="ignore")
-    return s.replace("\x00", "").strip()
+from .candidate_data import count_scorable
+from .ingest import get_ingest_queue, ingest_resume, ingest_timed_out, upload_path
+from .cache import cache_stats
+from .metrics import render_metrics
+from .matcher import MODES as MATCH_MODES, get_matcher, resolve_mode
 
 
 # ---------------------------------------------------------------
@@ -30,6 +27,17 @@ def init_app(app):
     app.config["UPLOAD_DIR"] = os.path.join(app.config["DATA_DIR"], "uploads")
     os.makedirs(app.config["UPLOAD_DIR"], exist_ok=True)
 
+    # ---------------- Cache Statistics ----------------
+    @app.route("/cache_stats")
+    def cache_stats_view():
+        stats = cache_stats()
+        stats["search"] = get_search_cache().stats()
+        return stats, 200
+
+    @app.route("/metrics")
+    def metrics_view():
+        return Response(render_metrics(), mimetype="text/plain; version=0.0.4")
+
     # ---------------- Home ----------------
     @app.route("/")
     def index():
@@ -51,23 +59,14 @@ def init_app(app):
             flash("Please enter skills to search", "warning")
             return redirect(url_for("candidate_login"))
 
-        jobs = crawl_jobs(skills, location, qualification)
+        jobs = get_search_cache().get(skills, location, qualification)
         if not jobs:
-            flash("No live jobs found, showing fallback data.", "info")
-            jobs_path = os.path.join(app.config["DATA_DIR"], "job_title_des.csv")
-            try:
-                df = pd.read_csv(jobs_path)
-                jobs = [
-                    {
-                        "title": r.get("job_title") or r.get("title") or "",
-                        "company": r.get("company") or "",
-                        "summary": r.get("description") or "",
-                        "url": r.get("url") or "#"
-                    }
-                    for _, r in df.head(10).iterrows()
-                ]
-            except Exception:
-                jobs = []
+            # the query is embedded only if the catalog has to break a tie at its cut-off
+            jobs = get_job_catalog().search(skills, query_emb=lambda: embed_texts([skills])[0])
+            if jobs:
+                flash("No live jobs found, showing fallback data.", "info")
+            else:
+                jobs = [placeholder_job(skills, location, qualification)]
 
         return render_template("jobs.html", jobs=jobs, skills=skills, location=location)
 
@@ -81,35 +80,121 @@ def init_app(app):
             flash("Please upload a valid resume file.", "danger")
             return redirect(request.referrer)
 
-        filename = secure_filename(file.filename)
-        save_path = os.path.join(app.config["UPLOAD_DIR"], filename)
-        file.save(save_path)
-
-        # Extract text and candidate info
-        resume_text = clean_text(extract_text_from_pdf(save_path))
-        extracted_name, extracted_email = extract_name_email(resume_text)
-        skills = extract_skills_from_text(resume_text, SKILL_MAP)
-
-        # ✅ Generate embedding for resume
-        cand_emb = embed_texts([resume_text])[0] if resume_text else None
-
-        candidate = Candidate(
-            name=clean_text(extracted_name),
-            email=clean_text(extracted_email),
-            resume_text=resume_text,
-            skills_json=json.dumps(skills),
-            embedding=json.dumps(cand_emb.tolist()) if cand_emb is not None else None
-        )
-        db.session.add(candidate)
-        db.session.commit()
-
-        # ✅ Handle AJAX vs normal form
-        if request.headers.get("X-Requested-With") == "XMLHttpRequest":
-            return {"status": "success", "message": f"Resume uploaded successfully for {extracted_name}."}, 200
-        else:
-            flash(f"Resume uploaded successfully for {extracted_name}.", "success")
+        ajax = request.headers.get("X-Requested-With") == "XMLHttpRequest"
+        queue = get_ingest_queue(app) if app.config["INGEST_WORKERS"] > 0 else None
+        if queue is not None and not queue.reserve():
+            message = "Too many resumes are being processed. Please try again shortly."
+            if ajax:
+                return {"status": "busy", "message": message}, 503, {"Retry-After": "10"}
+            flash(message, "warning")
             return redirect(request.referrer)
 
+        try:
+            filename = secure_filename(file.filename)
+            save_path = upload_path(app.config["UPLOAD_DIR"], filename)
+            file.save(save_path)
+
+            candidate = Candidate(name=filename, resume_path=save_path, ingest_status="pending",
+                                  ingest_queued_at=time.time())
+            db.session.add(candidate)
+            db.session.commit()
+
+            if queue is not None:
+                # ✅ Extraction and embedding happen in the background
+                queue.submit(candidate.id, save_path)
+        except Exception:
+            if queue is not None:
+                queue.release()
+            raise
+
+        if queue is None:
+            ingest_resume(save_path, candidate)
+            if candidate.ingest_status == "failed":
+                message = candidate.ingest_error or "Resume processing failed."
+                if ajax:
+                    return {"status": "failed", "message": message}, 500
+                flash(message, "danger")
+                return redirect(request.referrer)
+            message = f"Resume uploaded successfully for {candidate.name}."
+            if ajax:
+                return {"status": "success", "message": message,
+                        "recommendations_url": url_for("recommend_jobs_view", candidate_id=candidate.id)}, 200
+            flash(message, "success")
+            return redirect(request.referrer)
+
+        status_url = url_for("ingest_status", candidate_id=candidate.id)
+        message = f"Resume {filename} received and is being processed."
+        if ajax:
+            return {"status": "pending", "message": message, "status_url": status_url}, 202, {"Location": status_url}
+        flash(message, "success")
+        return redirect(request.referrer)
+
+    # ---------------- Resume Ingestion Status ----------------
+    @app.route("/ingest_status/<int:candidate_id>")
+    def ingest_status(candidate_id):
+        candidate = db.session.get(Candidate, candidate_id, options=[
+            db.load_only(Candidate.id, Candidate.name, Candidate.ingest_status, Candidate.ingest_error,
+                         Candidate.ingest_queued_at)
+        ])
+        if candidate is None:
+            return {"status": "error", "message": "Unknown upload."}, 404
+        status = candidate.ingest_status or "done"
+        body = {"id": candidate.id, "status": status}
+        if status == "done":
+            body["message"] = f"Resume uploaded successfully for {candidate.name}."
+            body["recommendations_url"] = url_for("recommend_jobs_view", candidate_id=candidate.id)
+        elif status == "failed":
+            body["message"] = candidate.ingest_error or "Resume processing failed."
+        elif ingest_timed_out(candidate):
+            body["status"] = "failed"
+            body["message"] = "Resume processing did not finish. Please upload it again."
+        else:
+            body["message"] = "Resume is being processed."
+        return body, 200
+
+    # ---------------- Candidate Job Recommendations ----------------
+    @app.route("/recommend_jobs/<int:candidate_id>")
+    def recommend_jobs_view(candidate_id):
+        candidate = db.session.get(Candidate, candidate_id, options=[db.defer(Candidate.resume_text)])
+        if candidate is None:
+            return {"status": "error", "message": "Unknown candidate."}, 404
+        status = candidate.ingest_status or "done"
+        if status != "done":
+            return {"status": status, "message": "Resume is not processed yet."}, 409
+
+        k = request.args.get("k", app.config["RECOMMEND_TOP_K"], type=int)
+        k = max(1, min(k, app.config["RECOMMEND_MAX_K"]))
+        results = recommend_jobs(candidate, k)
+
+        if request.args.get("format") == "json" or request.accept_mimetypes.best == "application/json":
+            return {
+                "candidate_id": candidate.id,
+                "jobs": [
+                    {
+                        "id": r["job"].id,
+                        "title": r["job"].title,
+                        "company": r["job"].company,
+                        "score": r["score"],
+                        "skills_match": r["skills_match"],
+                        "qualification_match": r["qualification_match"],
+                        "experience_match": r["experience_match"],
+                        "embedding_match": r["embedding_match"],
+                    }
+                    for r in results
+                ],
+            }, 200
+
+        jobs = [
+            {
+                "title": r["job"].title,
+                "company": r["job"].company,
+                "summary": (r["job"].description or "")[:300],
+                "score": r["score"],
+            }
+            for r in results
+        ]
+        return render_template("jobs.html", jobs=jobs, skills=", ".join(candidate.skill_list()), location="")
+
     # ---------------- HR Login ----------------
     @app.route("/hr_login", methods=["GET", "POST"])
     def hr_login():
@@ -137,59 +222,83 @@ def init_app(app):
             # ✅ Generate embedding for job description
             job_emb = embed_texts([job_desc])[0] if job_desc else None
 
+            job_features = extract_features(job_desc, SKILL_MAP)
             job = Job(
                 title=clean_text(job_title),
                 company=clean_text(company),
                 description=clean_text(job_desc),
-                skills_required=json.dumps(extract_skills_from_text(job_desc, SKILL_MAP)),
-                embedding=json.dumps(job_emb.tolist()) if job_emb is not None else None
+                skills_required=json.dumps(job_features["skills"]),
+                qualification=job_features["qualification"],
+                experience_years=job_features["experience_years"],
+                embedding=encode_embedding(job_emb)
             )
             db.session.add(job)
             db.session.commit()
 
             # Automatically match with all stored resumes
-            candidates = Candidate.query.all()
-            if not candidates:
+            if not count_scorable():
                 flash("No candidate resumes found in database.", "warning")
                 return redirect(url_for("upload_job_description"))
 
-            results = []
-            for cand in candidates:
-                if not cand.resume_text:
-                    continue
-
-                # Load embeddings back from JSON
-                cand_emb = np.array(json.loads(cand.embedding)) if cand.embedding else embed_texts([cand.resume_text])[0]
-                j_emb = np.array(json.loads(job.embedding)) if job.embedding else embed_texts([job.description])[0]
-
-                cand_skills = json.loads(cand.skills_json or "[]")
-                job_skills = json.loads(job.skills_required or "[]")
-
-                overlap = len(set(job_skills).intersection(set(cand_skills)))
-                skill_ratio = overlap / max(1, len(job_skills)) if job_skills else 0.0
-
-                # ✅ Compute full ATS-style score
-                score, breakdown = compute_match_score(
-                    cand_emb, j_emb, skill_ratio,
-                    cand_text=cand.resume_text,
-                    job_text=job.description
-                )
-
-                score_percent = round(score * 100, 2)
-                results.append({
-                    "candidate": cand,
-                    "email": cand.email,
-                    "score": score_percent,
-                    "skills_match": breakdown["skills"],
-                    "qualification_match": breakdown["qualification"],
-                    "experience_match": breakdown["experience"],
-                    "embedding_match": breakdown["embedding"],
-                    "status": "Shortlisted" if score_percent >= 50 else "Rejected"
-                })
-
-            return render_template("shortlist.html", results=sorted(results, key=lambda x: x["score"], reverse=True))
-
-        return render_template("upload.html")
+            # ✅ Score every candidate in batches and store the ranking
+            score_job_against_candidates(job, mode=request.form.get("scoring_mode") or None)
+            return redirect(url_for("shortlist", job_id=job.id))
+
+        return render_template("upload.html", scoring_mode=app.config["SCORING_MODE"])
+
+    # ---------------- Shortlist (paginated) ----------------
+    @app.route("/shortlist/<int:job_id>")
+    def shortlist(job_id):
+        job = db.session.get(Job, job_id, options=[db.defer(Job.embedding)])
+        if job is None:
+            return {"status": "error", "message": "Unknown job."}, 404
+
+        page = max(1, request.args.get("page", 1, type=int))
+        per_page = request.args.get("per_page", app.config["SHORTLIST_PAGE_SIZE"], type=int)
+        per_page = max(1, min(per_page, app.config["SHORTLIST_MAX_PAGE_SIZE"]))
+        min_score = request.args.get("min_score", type=float)
+        top_k = request.args.get("k", type=int)
+        # a no-op unless new candidates may have changed the job's prefiltered pool
+        refresh_stale_scores(job_id)
+        rows, total = ranking_page(job_id, page, per_page, min_score, top_k)
+        results = [result_row(row) for row in rows]
+        pages = max(1, -(-total // per_page))
+
+        if request.args.get("format") == "json" or request.accept_mimetypes.best == "application/json":
+            return {
+                "job_id": job.id,
+                "scoring_mode": job.scoring_mode or "weights",
+                "page": page,
+                "per_page": per_page,
+                "pages": pages,
+                "total": total,
+                "results": [
+                    dict(r, candidate=r["candidate"].name, candidate_id=r["candidate"].id)
+                    for r in results
+                ],
+            }, 200
+
+        # carry the filters over to the page links
+        filters = {k: v for k, v in {"per_page": per_page, "min_score": min_score, "k": top_k}.items()
+                   if v is not None and not (k == "per_page" and v == app.config["SHORTLIST_PAGE_SIZE"])}
+        return render_template("shortlist.html", results=results, job=job, page=page, pages=pages,
+                               total=total, rank_offset=(page - 1) * per_page, filters=filters,
+                               matcher_available=get_matcher().model() is not None)
+
+    @app.route("/shortlist/<int:job_id>/mode", methods=["POST"])
+    def shortlist_mode(job_id):
+        """Switch a job between fixed weights and the trained matcher; rescores it once."""
+        job = db.session.get(Job, job_id)
+        if job is None:
+            return {"status": "error", "message": "Unknown job."}, 404
+        mode = (request.form.get("mode") or "").strip().lower()
+        if mode not in MATCH_MODES:
+            return {"status": "error", "message": f"mode must be one of {', '.join(MATCH_MODES)}."}, 400
+        # without a model file "matcher" resolves to "weights": nothing to rescore then
+        if resolve_mode(mode) != (job.scoring_mode or "weights"):
+            score_job_against_candidates(job, mode=mode)
+        filters = {k: request.args[k] for k in ("per_page", "min_score", "k", "page") if k in request.args}
+        return redirect(url_for("shortlist", job_id=job_id, **filters))
 
     # ---------------- Download Results ----------------
     @app.route("/download_results")
@@ -197,44 +306,23 @@ def init_app(app):
         from io import StringIO
         import csv
 
-        results = []
-        jobs = Job.query.all()
-        candidates = Candidate.query.all()
-
-        for job in jobs:
-            job_skills = json.loads(job.skills_required or "[]")
-            job_emb = np.array(json.loads(job.embedding)) if job.embedding else None
-
-            for cand in candidates:
-                cand_skills = json.loads(cand.skills_json or "[]")
-                cand_emb = np.array(json.loads(cand.embedding)) if cand.embedding else None
-
-                overlap = len(set(job_skills).intersection(set(cand_skills)))
-                skill_ratio = overlap / max(1, len(job_skills)) if job_skills else 0.0
-
-                score, breakdown = compute_match_score(
-                    cand_emb, job_emb, skill_ratio,
-                    cand_text=cand.resume_text, job_text=job.description
-                )
-
-                results.append({
-                    "name": cand.name,
-                    "email": cand.email,
-                    "score": round(score * 100, 2),
-                    "skills": breakdown["skills"],
-                    "qualification": breakdown["qualification"],
-                    "experience": breakdown["experience"],
-                    "embedding": breakdown["embedding"],
-                    "status": "Shortlisted" if score >= 0.5 else "Rejected"
-                })
-
-        output = StringIO()
-        writer = csv.writer(output)
-        writer.writerow(["Candidate Name", "Email", "Total Score (%)", "Skills (%)", "Qualification (%)", "Experience (%)", "Embedding (%)", "Status"])
-
-        for r in results:
-            writer.writerow([r["name"], r["email"], r["score"], r["skills"], r["qualification"], r["experience"], r["embedding"], r["status"]])
-
-        output.seek(0)
-        return Response(output, mimetype="text/csv",
+        job_id = request.args.get("job_id", type=int)
+        min_score = request.args.get("min_score", type=float)
+        status = request.args.get("status", "").strip()
+        refresh_stale_scores(job_id)
+
+        def generate():
+            output = StringIO()
+            writer = csv.writer(output)
+            writer.writerow(["Candidate Name", "Email", "Total Score (%)", "Skills (%)", "Qualification (%)", "Experience (%)", "Embedding (%)", "Status"])
+            for i, (name, email, score, skills, qual, exp, emb) in enumerate(export_rows(job_id, min_score, status), 1):
+                writer.writerow([name, email, round(score * 100, 2), skills, qual, exp, emb,
+                                 "Shortlisted" if score >= 0.5 else "Rejected"])
+                if i % 500 == 0:
+                    yield output.getvalue()
+                    output.seek(0)
+                    output.truncate(0)
+            yield output.getvalue()
+
+        return Response(stream_with_context(generate()), mimetype="text/csv",
                         headers={"Content-Disposition": "attachment;filename=HR_dashboard_results.csv"})
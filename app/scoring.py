@@ -0,0 +1,373 @@
+"""
+Materialized match scores.
+
+Each (job, candidate) pair is scored once and stored in the applications table with its
+component breakdown and SCORING_VERSION. The stored match_score comes from the fixed
+weights or, for jobs scored in "matcher" mode, from the trained model (app.matcher).
+A new job is scored against all candidates (or the skill-prefiltered subset, see
+app.skill_index) and a new candidate against all jobs, in batches; pages and exports
+then read indexed rows. Candidates are read through app.candidate_data, and refreshing
+several stale jobs scores each candidate batch against all of them in one pass.
+"""
+import json
+import numpy as np
+from sqlalchemy.exc import IntegrityError
+from config import Config
+from . import db
+from .metrics import timed
+from .models import Candidate, Job, Application
+from .utils import (
+    embed_texts, decode_embedding, skill_overlap_ratios, job_skill_ratios, stack_embeddings,
+    cosine_sim_matrix, qualification_scores, experience_scores, weighted_scores,
+    SCORING_VERSION
+)
+from .matcher import get_matcher, resolve_mode, token_set, job_token_set, token_overlap_ratios
+from .candidate_data import iter_candidate_batches, count_scorable
+from .vector_index import sync_candidate_index
+from .skill_index import prefilter_enabled, prefilter_candidate_ids, prefilter_admits
+
+BATCH_SIZE = 5000
+# Job.scoring_version of a top-N prefiltered job a new candidate may enter: rescore its pool
+POOL_OUTDATED = 0
+
+
+# ---------------------------------------------------------------
+# Feature preparation
+# ---------------------------------------------------------------
+@timed("score_batch")
+def score_job(job, job_emb, features, cand_matrix, mode="weights", job_tokens=None):
+    """
+    Return (scores, breakdown) arrays for one job against all prepared candidates.
+    features is CandidateBatch.features(); in "matcher" mode the batch must have been
+    loaded with the resume texts. The breakdown still
+    shows the weighted components while the scores come from one model.predict call.
+    """
+    emb_sim = cosine_sim_matrix(cand_matrix, job_emb)
+    skill_ratios = skill_overlap_ratios(json.loads(job.skills_required or "[]"), features["skills"])
+    scores, breakdown = weighted_scores(
+        emb_sim, skill_ratios,
+        qualification_scores(features["qualifications"], job.qualification or "unknown"),
+        experience_scores(features["experience"], job.experience_years or 0)
+    )
+    if mode == "matcher":
+        if job_tokens is None:
+            job_tokens = job_token_set(job.title, job.description)
+        cand_tokens = features.get("token_sets")
+        if cand_tokens is None:
+            cand_tokens = [token_set(t) for t in features["texts"]]
+        ratios = token_overlap_ratios(job_tokens, cand_tokens)
+        scores = get_matcher().predict(emb_sim, ratios)
+    return scores, breakdown
+
+
+def candidate_matrix(batch, index):
+    """Embedding rows for a CandidateBatch from the shared index; unindexed resumes are embedded."""
+    _, vectors = index.matrix()
+    positions, found = index.lookup(batch.ids)
+    matrix = np.zeros((len(batch), index.dim), dtype=np.float32)
+    matrix[found] = vectors[positions[found]]
+    missing = np.flatnonzero(~found)
+    if len(missing):
+        matrix[missing] = embed_texts(batch.resume_texts(missing.tolist()))
+    return matrix
+
+
+def _application_rows(job_ids, cand_ids, scores, breakdown):
+    return [
+        {
+            "job_id": int(job_ids[i]),
+            "candidate_id": int(cand_ids[i]),
+            "match_score": float(scores[i]),
+            "skills_score": float(breakdown["skills"][i]),
+            "qualification_score": float(breakdown["qualification"][i]),
+            "experience_score": float(breakdown["experience"][i]),
+            "embedding_score": float(breakdown["embedding"][i]),
+            "scoring_version": SCORING_VERSION,
+        }
+        for i in range(len(scores))
+    ]
+
+
+def _retry_on_conflict(fn, *args):
+    """A job and a candidate scored concurrently can both write the same pair; retry once."""
+    try:
+        return fn(*args)
+    except IntegrityError:
+        db.session.rollback()
+        return fn(*args)
+
+
+# ---------------------------------------------------------------
+# Incremental recompute
+# ---------------------------------------------------------------
+def iter_job_scores(job, job_emb=None, candidate_ids=None, batch_size=BATCH_SIZE, index=None, mode="weights"):
+    """Yield (candidate ids, scores, breakdown) per batch for one job, without storing anything."""
+    if job_emb is None:
+        job_emb = decode_embedding(job.embedding)
+    index = index or sync_candidate_index()
+    matcher = mode == "matcher"
+    job_tokens = job_token_set(job.title, job.description) if matcher else None
+    for batch in iter_candidate_batches(batch_size, candidate_ids, with_text=matcher):
+        scores, breakdown = score_job(job, job_emb, batch.features(), candidate_matrix(batch, index),
+                                      mode, job_tokens)
+        yield batch.ids, scores, breakdown
+
+
+def _score_job(job, batch_size, mode):
+    mode = resolve_mode(mode)
+    job.scoring_mode = mode
+    job.scoring_version = SCORING_VERSION
+    # two-stage matching: only candidates sharing skills with the job, when configured
+    candidate_ids = prefilter_candidate_ids(job.skill_list())
+    db.session.execute(db.delete(Application).where(Application.job_id == job.id))
+    total = 0
+    for cand_ids, scores, breakdown in iter_job_scores(job, candidate_ids=candidate_ids,
+                                                       batch_size=batch_size, mode=mode):
+        db.session.execute(db.insert(Application),
+                           _application_rows([job.id] * len(cand_ids), cand_ids, scores, breakdown))
+        total += len(cand_ids)
+    db.session.commit()
+    return total
+
+
+def score_job_against_candidates(job, batch_size=BATCH_SIZE, mode=None):
+    """
+    (Re)score one job against every candidate and store the rows. Returns the row count.
+    mode is "weights" or "matcher"; by default the job keeps the mode it was scored with.
+    """
+    return _retry_on_conflict(_score_job, job, batch_size, mode or job.scoring_mode or Config.SCORING_MODE)
+
+
+def _score_jobs(jobs, batch_size):
+    index = sync_candidate_index()
+    plans = []
+    for job in jobs:
+        mode = resolve_mode(job.scoring_mode or Config.SCORING_MODE)
+        job.scoring_mode = mode
+        job.scoring_version = SCORING_VERSION
+        tokens = job_token_set(job.title, job.description) if mode == "matcher" else None
+        plans.append((job, decode_embedding(job.embedding), mode, tokens))
+    db.session.execute(db.delete(Application).where(Application.job_id.in_([job.id for job in jobs])))
+    with_text = any(mode == "matcher" for _, _, mode, _ in plans)
+    total = 0
+    for batch in iter_candidate_batches(batch_size, with_text=with_text):
+        features, matrix = batch.features(), candidate_matrix(batch, index)
+        rows = []
+        for job, job_emb, mode, tokens in plans:
+            scores, breakdown = score_job(job, job_emb, features, matrix, mode, tokens)
+            rows.extend(_application_rows([job.id] * len(batch), batch.ids, scores, breakdown))
+        db.session.execute(db.insert(Application), rows)
+        total += len(rows)
+    db.session.commit()
+    return total
+
+
+def score_jobs_against_candidates(jobs, batch_size=BATCH_SIZE):
+    """
+    (Re)score several jobs against every candidate in one pass over the candidates, each
+    in the mode it was last scored with. Returns the row count.
+    """
+    jobs = list(jobs)
+    return _retry_on_conflict(_score_jobs, jobs, batch_size) if jobs else 0
+
+
+def _score_candidate(candidate, cand_emb, batch_size, apply=None):
+    if apply is not None:
+        apply()
+    cand_skills = candidate.skill_list()
+    cand_qual = candidate.qualification or "unknown"
+    cand_exp = candidate.experience_years or 0
+    cand_tokens = None
+    db.session.execute(db.delete(Application).where(Application.candidate_id == candidate.id))
+    total, last_id = 0, 0
+    while True:
+        rows = db.session.execute(
+            db.select(Job.id, Job.skills_required, Job.qualification, Job.experience_years, Job.embedding,
+                      Job.scoring_mode)
+            .where(Job.id > last_id).order_by(Job.id).limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        last_id = rows[-1].id
+        job_skills = [json.loads(r.skills_required or "[]") for r in rows]
+        # only the prefiltered jobs whose pool this candidate would be in get a row;
+        # top-N pools it may enter are recomputed by refresh_stale_scores instead
+        admits = prefilter_admits(candidate.id, job_skills)
+        repool = [r.id for r, admit in zip(rows, admits) if admit is None]
+        if repool:
+            db.session.execute(db.update(Job).where(Job.id.in_(repool)).values(scoring_version=POOL_OUTDATED))
+        rows = [r for r, admit in zip(rows, admits) if admit]
+        job_skills = [s for s, admit in zip(job_skills, admits) if admit]
+        if not rows:
+            continue
+        job_ids = [r.id for r in rows]
+        job_matrix = stack_embeddings([decode_embedding(r.embedding) for r in rows],
+                                      dim=Config.EMBEDDING_DIM, dtype=np.float32)
+        emb_sim = cosine_sim_matrix(job_matrix, cand_emb)
+        scores, breakdown = weighted_scores(
+            emb_sim,
+            job_skill_ratios(job_skills, cand_skills),
+            qualification_scores(cand_qual, [r.qualification or "unknown" for r in rows]),
+            experience_scores(cand_exp, [r.experience_years or 0 for r in rows])
+        )
+        # jobs ranked by the trained model get a model score for this candidate too
+        matcher_rows = [i for i, r in enumerate(rows) if r.scoring_mode == "matcher"]
+        if matcher_rows and get_matcher().model() is not None:
+            if cand_tokens is None:
+                cand_tokens = token_set(candidate.resume_text)
+            job_tokens = {
+                r.id: job_token_set(r.title, r.description)
+                for r in db.session.execute(
+                    db.select(Job.id, Job.title, Job.description)
+                    .where(Job.id.in_([job_ids[i] for i in matcher_rows]))
+                )
+            }
+            ratios = [token_overlap_ratios(job_tokens.get(job_ids[i], set()), [cand_tokens])[0] for i in matcher_rows]
+            scores[matcher_rows] = get_matcher().predict(emb_sim[matcher_rows], ratios)
+        db.session.execute(db.insert(Application),
+                           _application_rows(job_ids, [candidate.id] * len(job_ids), scores, breakdown))
+        total += len(rows)
+    db.session.commit()
+    return total
+
+
+def score_candidate_against_jobs(candidate, cand_emb=None, batch_size=BATCH_SIZE, apply=None):
+    """
+    (Re)score one candidate against every stored job. Returns the row count. apply, if
+    given, writes the candidate's own changes first, in the same transaction (and again on
+    a retry), so the candidate is never committed without its scores.
+    """
+    if cand_emb is None:
+        cand_emb = decode_embedding(candidate.embedding)
+    return _retry_on_conflict(_score_candidate, candidate, cand_emb, batch_size, apply)
+
+
+def stale_job_ids(job_id=None):
+    """
+    Jobs whose stored scores are missing, partial or from an older SCORING_VERSION.
+    With the skill prefilter on, jobs hold rows for a subset of candidates only (possibly
+    none), so freshness comes from the version stamped on the job when it was scored, plus
+    any outdated rows; jobs from before the stamp existed count as scored if they have
+    current rows. A job stamped POOL_OUTDATED has a top-N pool a new candidate may enter.
+    """
+    jobs = db.select(Job.id, Job.scoring_version).order_by(Job.id)
+    if job_id is not None:
+        jobs = jobs.where(Job.id == job_id)
+    current = (
+        db.select(Application.job_id, db.func.count(Application.id))
+        .where(Application.scoring_version == SCORING_VERSION)
+        .group_by(Application.job_id)
+    )
+    if job_id is not None:
+        current = current.where(Application.job_id == job_id)
+    current = dict(db.session.execute(current).all())
+
+    if prefilter_enabled():
+        outdated = (
+            db.select(Application.job_id).distinct()
+            .where(db.or_(Application.scoring_version.is_(None), Application.scoring_version != SCORING_VERSION))
+        )
+        if job_id is not None:
+            outdated = outdated.where(Application.job_id == job_id)
+        outdated = set(db.session.execute(outdated).scalars())
+        stale = []
+        for jid, version in db.session.execute(jobs).all():
+            scored = current.get(jid) if version is None else version == SCORING_VERSION
+            if not scored or jid in outdated:
+                stale.append(jid)
+        return stale
+
+    n_candidates = count_scorable()
+    return [jid for jid, _ in db.session.execute(jobs).all() if current.get(jid, 0) != n_candidates]
+
+
+def refresh_stale_scores(job_id=None):
+    stale = [db.session.get(Job, jid) for jid in stale_job_ids(job_id)]
+    # prefiltered jobs each score their own candidate subset; the rest share one pass
+    shared = [job for job in stale if not prefilter_enabled() or not job.skill_list()]
+    for job in stale:
+        if job not in shared:
+            score_job_against_candidates(job)
+    score_jobs_against_candidates(shared)
+    return len(stale)
+
+
+# ---------------------------------------------------------------
+# Reading stored rankings
+# ---------------------------------------------------------------
+def result_row(app_row):
+    score_percent = round(app_row.match_score * 100, 2)
+    return {
+        "candidate": app_row.candidate,
+        "email": app_row.candidate.email,
+        "score": score_percent,
+        "skills_match": app_row.skills_score,
+        "qualification_match": app_row.qualification_score,
+        "experience_match": app_row.experience_score,
+        "embedding_match": app_row.embedding_score,
+        "status": "Shortlisted" if score_percent >= 50 else "Rejected"
+    }
+
+
+def job_ranking(job_id):
+    """Stored applications for a job, best first, with only the candidate columns the page shows."""
+    return (
+        Application.query
+        .options(db.joinedload(Application.candidate).load_only(Candidate.id, Candidate.name, Candidate.email))
+        .filter(Application.job_id == job_id)
+        .order_by(Application.match_score.desc(), Application.candidate_id)
+    )
+
+
+def ranking_page(job_id, page=1, per_page=None, min_score=None, top_k=None):
+    """
+    One page of a job's stored ranking. The (job_id, match_score) index serves the
+    ORDER BY ... LIMIT directly, so no page sorts or rescores the whole pool.
+    min_score is a percentage; top_k caps how far down the ranking pages can go.
+    Returns (rows, total) where total is the number of rows available across all pages.
+    """
+    per_page = per_page or Config.SHORTLIST_PAGE_SIZE
+    top_k = Config.SHORTLIST_TOP_K if top_k is None else top_k
+    min_score = Config.SHORTLIST_MIN_SCORE if min_score is None else min_score
+    query = job_ranking(job_id)
+    count = db.select(db.func.count(Application.id)).where(Application.job_id == job_id)
+    if min_score:
+        query = query.filter(Application.match_score >= min_score / 100.0)
+        count = count.where(Application.match_score >= min_score / 100.0)
+    total = db.session.execute(count).scalar()
+    if top_k:
+        total = min(total, top_k)
+    offset = (max(page, 1) - 1) * per_page
+    limit = max(0, min(per_page, total - offset))
+    rows = query.offset(offset).limit(limit).all() if limit else []
+    return rows, total
+
+
+def export_rows(job_id=None, min_score=None, status=None, batch_size=1000):
+    """
+    Stream (name, email, match_score, skills, qualification, experience, embedding) tuples
+    for the CSV export in server-side batches. min_score is a percentage; status is
+    "Shortlisted" or "Rejected".
+    """
+    query = (
+        db.session.query(
+            Candidate.name, Candidate.email, Application.match_score,
+            Application.skills_score, Application.qualification_score,
+            Application.experience_score, Application.embedding_score
+        )
+        .join(Candidate, Candidate.id == Application.candidate_id)
+    )
+    if job_id is not None:
+        query = query.filter(Application.job_id == job_id)
+    if min_score is not None:
+        query = query.filter(Application.match_score >= min_score / 100.0)
+    if status:
+        if status.lower() == "shortlisted":
+            query = query.filter(Application.match_score >= 0.5)
+        elif status.lower() == "rejected":
+            query = query.filter(Application.match_score < 0.5)
+    return (
+        query.order_by(Application.job_id, Application.match_score.desc())
+        .execution_options(stream_results=True)
+        .yield_per(batch_size)
+    )
@@ -0,0 +1,145 @@
+"""
+In-process cache for live job search results.
+
+Entries are keyed on the normalized (skills, location, qualification) and are fresh for
+SEARCH_CACHE_TTL seconds. For SEARCH_CACHE_STALE seconds after that they are still served
+immediately while one background refresh runs. Concurrent misses for the same key share a
+single crawl, and the cache keeps at most SEARCH_CACHE_SIZE entries (least recently used
+are dropped). fetch returns (value, complete); an incomplete result (a crawl that hit
+errors or the deadline, or found nothing) is kept only SEARCH_CACHE_NEGATIVE_TTL seconds
+and never served stale, so one bad upstream moment does not hide live jobs for long.
+A refresh of a complete entry that fails or comes back incomplete keeps the previous
+value (stale-if-error); the next refresh is tried SEARCH_CACHE_NEGATIVE_TTL seconds later.
+"""
+import time, threading
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from config import Config
+
+
+def normalize_key(skills, location, qualification=None):
+    def parts(value):
+        return tuple(sorted({p.strip().lower() for p in (value or "").split(",") if p.strip()}))
+    return parts(skills), parts(location), (qualification or "").strip().lower()
+
+
+class SearchCache:
+    def __init__(self, fetch, ttl=None, stale_ttl=None, max_entries=None, negative_ttl=None):
+        self.fetch = fetch
+        self.ttl = Config.SEARCH_CACHE_TTL if ttl is None else ttl
+        self.stale_ttl = Config.SEARCH_CACHE_STALE if stale_ttl is None else stale_ttl
+        self.negative_ttl = Config.SEARCH_CACHE_NEGATIVE_TTL if negative_ttl is None else negative_ttl
+        self.max_entries = max_entries or Config.SEARCH_CACHE_SIZE
+        self._entries = OrderedDict()   # key -> (fetched_at, value, ttl, stale_ttl, complete)
+        self._inflight = {}             # key -> Future shared by coalesced callers
+        self._retry_at = {}             # key -> earliest refresh after a failed one
+        self._lock = threading.Lock()
+        self._refresher = ThreadPoolExecutor(max_workers=2, thread_name_prefix="search-refresh")
+        self.counters = {"hits": 0, "stale_hits": 0, "misses": 0, "coalesced": 0,
+                         "refreshes": 0, "fetch_errors": 0, "incomplete": 0, "kept_stale": 0}
+        self._fetch_count = 0
+        self._fetch_seconds = 0.0
+        self._fetch_max = 0.0
+
+    def get(self, skills, location, qualification=None):
+        key = normalize_key(skills, location, qualification)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                fetched_at, value, ttl, stale_ttl, _ = entry
+                age = now - fetched_at
+                if age < ttl + stale_ttl:
+                    self._entries.move_to_end(key)
+                    if age < ttl:
+                        self.counters["hits"] += 1
+                    else:
+                        self.counters["stale_hits"] += 1
+                        if key not in self._inflight and now >= self._retry_at.get(key, 0):
+                            self._inflight[key] = Future()
+                            self.counters["refreshes"] += 1
+                            self._refresher.submit(self._load, key, skills, location, qualification)
+                    return value
+            future = self._inflight.get(key)
+            if future is not None:
+                self.counters["coalesced"] += 1
+                owner = False
+            else:
+                future = self._inflight[key] = Future()
+                self.counters["misses"] += 1
+                owner = True
+        if owner:
+            self._load(key, skills, location, qualification)
+        return future.result()
+
+    def _load(self, key, skills, location, qualification):
+        """Fetch, store and resolve the in-flight future for key (exactly one caller per key)."""
+        with self._lock:
+            future = self._inflight[key]
+        start = time.monotonic()
+        error = None
+        try:
+            value, complete = self.fetch(skills, location, qualification)
+        except Exception as e:
+            value, complete, error = None, False, e
+        now = time.monotonic()
+        with self._lock:
+            if error is None:
+                self._fetch_count += 1
+                self._fetch_seconds += now - start
+                self._fetch_max = max(self._fetch_max, now - start)
+            else:
+                self.counters["fetch_errors"] += 1
+            previous = self._entries.get(key)
+            if complete:
+                self._entries[key] = (now, value, self.ttl, self.stale_ttl, True)
+                self._retry_at.pop(key, None)
+            elif previous is not None and previous[4] and now - previous[0] < previous[2] + previous[3]:
+                # stale-if-error: keep the last good value and back off before retrying
+                self.counters["kept_stale"] += 1
+                value, error = previous[1], None
+                self._retry_at[key] = now + self.negative_ttl
+            elif error is None:
+                self.counters["incomplete"] += 1
+                self._entries[key] = (now, value, self.negative_ttl, 0, False)
+            if key in self._entries:
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                evicted, _ = self._entries.popitem(last=False)
+                self._retry_at.pop(evicted, None)
+            self._inflight.pop(key, None)
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(value)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self.counters)
+            stats["entries"] = len(self._entries)
+            stats["fetches"] = self._fetch_count
+            stats["fetch_avg_ms"] = round(self._fetch_seconds / self._fetch_count * 1000, 1) if self._fetch_count else 0.0
+            stats["fetch_max_ms"] = round(self._fetch_max * 1000, 1)
+        served = stats["hits"] + stats["stale_hits"] + stats["misses"] + stats["coalesced"]
+        stats["hit_ratio"] = round((stats["hits"] + stats["stale_hits"]) / served, 4) if served else 0.0
+        return stats
+
+
+def crawl_for_cache(skills, location, qualification=None):
+    """crawl_jobs as a SearchCache fetch: complete only when every page arrived and jobs were found."""
+    from .crawler import crawl_jobs
+    report = {}
+    jobs = crawl_jobs(skills, location, qualification, report=report)
+    complete = bool(jobs) and not report.get("errors") and not report.get("timeouts")
+    return jobs, complete
+
+
+_CACHE = None
+_cache_lock = threading.Lock()
+
+def get_search_cache():
+    global _CACHE
+    with _cache_lock:
+        if _CACHE is None:
+            _CACHE = SearchCache(crawl_for_cache)
+        return _CACHE
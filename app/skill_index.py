@@ -0,0 +1,120 @@
+"""
+Skill posting lists for two-stage job matching.
+
+candidate_skills holds one (skill, candidate_id) row per canonical skill a candidate has
+(the same names extract_skills_from_text produces), so "candidates sharing skills with a
+job" is an index range scan per skill instead of a pass over every resume.
+With MATCH_PREFILTER_MIN_SKILLS and/or MATCH_PREFILTER_TOP_N set, a new job is scored only
+against the candidates returned by prefilter_candidate_ids; the embedding rerank runs on
+that subset. Both settings at 0 keep exhaustive scoring.
+"""
+import json
+from config import Config
+from . import db
+from .models import Candidate, CandidateSkill
+
+
+def prefilter_enabled(min_shared=None, top_n=None):
+    min_shared = Config.MATCH_PREFILTER_MIN_SKILLS if min_shared is None else min_shared
+    top_n = Config.MATCH_PREFILTER_TOP_N if top_n is None else top_n
+    return bool(min_shared or top_n)
+
+
+def _parse_skills(value):
+    """skills_json as stored; older rows may hold a comma separated string."""
+    try:
+        return json.loads(value or "[]")
+    except ValueError:
+        return [s.strip() for s in (value or "").split(",") if s.strip()]
+
+
+def set_candidate_skills(candidate_id, skills):
+    """Replace one candidate's posting-list rows; the caller commits."""
+    db.session.execute(db.delete(CandidateSkill).where(CandidateSkill.candidate_id == candidate_id))
+    rows = [{"skill": s, "candidate_id": candidate_id} for s in dict.fromkeys(skills or [])]
+    if rows:
+        db.session.execute(db.insert(CandidateSkill), rows)
+
+
+def add_candidate_skills(pairs):
+    """Bulk insert for new candidates: pairs of (candidate_id, skills). The caller commits."""
+    rows = [
+        {"skill": s, "candidate_id": cand_id}
+        for cand_id, skills in pairs
+        for s in dict.fromkeys(skills or [])
+    ]
+    if rows:
+        db.session.execute(db.insert(CandidateSkill), rows)
+
+
+def rebuild_skill_index(batch_size=1000):
+    """Recreate every posting list from candidates.skills_json. Returns the candidate count."""
+    db.session.execute(db.delete(CandidateSkill))
+    total, last_id = 0, 0
+    while True:
+        rows = db.session.execute(
+            db.select(Candidate.id, Candidate.skills_json)
+            .where(Candidate.id > last_id).order_by(Candidate.id).limit(batch_size)
+        ).all()
+        if not rows:
+            break
+        add_candidate_skills((r.id, _parse_skills(r.skills_json)) for r in rows)
+        total += len(rows)
+        last_id = rows[-1].id
+    db.session.commit()
+    return total
+
+
+def prefilter_candidate_ids(job_skills, min_shared=None, top_n=None):
+    """
+    Candidate ids sharing at least min_shared of the job's skills, limited to the top_n
+    by number of shared skills. Returns None when prefiltering is off or the job lists no
+    skills, meaning every candidate should be scored.
+    """
+    min_shared = Config.MATCH_PREFILTER_MIN_SKILLS if min_shared is None else min_shared
+    top_n = Config.MATCH_PREFILTER_TOP_N if top_n is None else top_n
+    skills = list(dict.fromkeys(job_skills or []))
+    if not prefilter_enabled(min_shared, top_n) or not skills:
+        return None
+
+    shared = db.func.count(CandidateSkill.skill)
+    query = (
+        db.select(CandidateSkill.candidate_id)
+        .where(CandidateSkill.skill.in_(skills))
+        .group_by(CandidateSkill.candidate_id)
+    )
+    if min_shared:
+        query = query.having(shared >= min(min_shared, len(skills)))
+    if top_n:
+        query = query.order_by(shared.desc(), CandidateSkill.candidate_id).limit(top_n)
+    return db.session.execute(query).scalars().all()
+
+
+def prefilter_admits(candidate_id, job_skill_lists, min_shared=None, top_n=None):
+    """
+    For one candidate, whether each job's prefilter (prefilter_candidate_ids) would include
+    it, so candidate-side scoring writes rows only to the pools the jobs would pick
+    themselves. Uses the candidate's candidate_skills rows; jobs without skills admit everyone.
+    With top_n, a candidate reaching the threshold gets None: whether it makes the top n,
+    and who it pushes out, is left to rescoring that job's whole pool.
+    """
+    min_shared = Config.MATCH_PREFILTER_MIN_SKILLS if min_shared is None else min_shared
+    top_n = Config.MATCH_PREFILTER_TOP_N if top_n is None else top_n
+    if not prefilter_enabled(min_shared, top_n):
+        return [True] * len(job_skill_lists)
+    cand_skills = set(db.session.execute(
+        db.select(CandidateSkill.skill).where(CandidateSkill.candidate_id == candidate_id)
+    ).scalars())
+    admits = []
+    for job_skills in job_skill_lists:
+        skills = list(dict.fromkeys(job_skills or []))
+        if not skills:
+            admits.append(True)
+            continue
+        # the posting-list join only ever returns candidates with a shared skill
+        threshold = max(1, min(min_shared, len(skills)))
+        if len(cand_skills.intersection(skills)) < threshold:
+            admits.append(False)
+        else:
+            admits.append(None if top_n else True)
+    return admits
@@ -1,7 +1,18 @@
-import os, re, json
+import os, re, json, pickle, struct, threading, zlib
+import numpy as np
 from config import Config
+from .metrics import timed
+
+# -------------------- Text Cleaning --------------------
+def clean_text(s):
+    if s is None:
+        return ""
+    if isinstance(s, bytes):
+        s = s.decode("utf-8", errors="ignore")
+    return s.replace("\x00", "").strip()
 
 # -------------------- PDF Text Extraction --------------------
+@timed("extract_text_pdf")
 def extract_text_from_pdf(path):
     try:
         import pdfplumber
@@ -19,6 +30,37 @@ def extract_text_from_pdf(path):
         except Exception:
             return ""
 
+@timed("extract_text_docx")
+def extract_text_from_docx(path):
+    try:
+        from docx import Document
+        doc = Document(path)
+        return re.sub(r'\s+', ' ', "\n".join(p.text for p in doc.paragraphs)).strip()
+    except Exception:
+        return ""
+
+def extract_text_from_file(path):
+    """
+    Dispatch on extension; anything that is not .docx goes through the PDF extractor.
+    Results are cached by the SHA-256 of the file, so re-uploads skip parsing. Empty
+    results are not cached: the extractors return "" on any error, which may be transient.
+    """
+    from .cache import get_cache, sha256_file
+    cache = get_cache("text")
+    try:
+        key = sha256_file(path)
+    except OSError:
+        return ""
+    text = cache.get(key)
+    if text is None:
+        if path.lower().endswith(".docx"):
+            text = extract_text_from_docx(path)
+        else:
+            text = extract_text_from_pdf(path)
+        if text:
+            cache.put(key, text)
+    return text
+
 # -------------------- Load Skill Aliases --------------------
 def load_skill_aliases(csv_path):
     mapping = {}
@@ -59,17 +101,85 @@ def get_skill_map():
         _skill_map_cache = load_skill_aliases(csv_path)
     return _skill_map_cache
 
-def extract_skills_from_text(text, skill_map=None):
+_WORD_CHAR = re.compile(r"\w")
+
+def _is_boundary(text, i):
+    """Same test as regex \\b at position i."""
+    before = i > 0 and _WORD_CHAR.match(text, i - 1) is not None
+    after = i < len(text) and _WORD_CHAR.match(text, i) is not None
+    return before != after
+
+def _trie_to_regex(node):
+    """Alternation with shared prefixes factored out; longer aliases are tried first."""
+    branches = [re.escape(ch) + _trie_to_regex(child) for ch, child in sorted(node.items()) if ch]
+    if not branches:
+        return ""
+    body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    return "(?:" + body + ")?" if "" in node else body
+
+class SkillMatcher:
+    """
+    Finds every alias of every skill in one pass over the text.
+    The aliases are compiled into a single trie-shaped regex inside a lookahead, so each
+    start position reports the longest alias bounded by \\b; shorter aliases that are
+    prefixes of it are then checked directly. Results match the per-alias re.search loop.
+    """
+    def __init__(self, skill_map):
+        self.alias_skills = {}
+        for canonical, aliases in skill_map.items():
+            for a in aliases:
+                self.alias_skills.setdefault(a, set()).add(canonical)
+        # an empty alias matches any text containing a word boundary
+        self.empty_skills = self.alias_skills.pop("", set())
+
+        trie = {}
+        for a in self.alias_skills:
+            node = trie
+            for ch in a:
+                node = node.setdefault(ch, {})
+            node[""] = a
+        self.prefixes = {}
+        for a in self.alias_skills:
+            node, found = trie, []
+            for ch in a[:-1]:
+                node = node[ch]
+                if "" in node:
+                    found.append(node[""])
+            self.prefixes[a] = found
+        self._pattern = re.compile(r"(?=\b(" + _trie_to_regex(trie) + r")\b)") if trie else None
+
+    def find(self, text):
+        text_l = (text or "").lower()
+        found = set()
+        if self.empty_skills and re.search(r"\b", text_l):
+            found |= self.empty_skills
+        if self._pattern is None:
+            return sorted(found)
+        for m in self._pattern.finditer(text_l):
+            alias = m.group(1)
+            found |= self.alias_skills[alias]
+            start = m.start(1)
+            for p in self.prefixes[alias]:
+                if not self.alias_skills[p] <= found and _is_boundary(text_l, start + len(p)):
+                    found |= self.alias_skills[p]
+        return sorted(found)
+
+_skill_matchers = {}
+def get_skill_matcher(skill_map=None):
+    """Compiled matcher for a skill map, built once per map object."""
     if not skill_map:
         skill_map = get_skill_map()
-    found = set()
-    text_l = (text or "").lower()
-    for canonical, aliases in skill_map.items():
-        for a in aliases:
-            if re.search(r'\b' + re.escape(a) + r'\b', text_l):
-                found.add(canonical)
-                break
-    return sorted(found)
+    cached = _skill_matchers.get(id(skill_map))
+    if cached is None or cached[0] is not skill_map:
+        if len(_skill_matchers) >= 8:
+            _skill_matchers.clear()
+        cached = (skill_map, SkillMatcher(skill_map))
+        _skill_matchers[id(skill_map)] = cached
+    return cached[1]
+
+@timed("extract_skills")
+def extract_skills_from_text(text, skill_map=None):
+    return get_skill_matcher(skill_map).find(text)
 
 # -------------------- Attribute Extraction --------------------
 def extract_experience(text):
@@ -126,27 +236,130 @@ def extract_qualification(text):
         return "unknown"
 
 
+def extract_features(text, skill_map=None):
+    """Features stored with each resume / job at ingest time so scoring never rescans text."""
+    text = text or ""
+    return {
+        "skills": extract_skills_from_text(text, skill_map),
+        "qualification": extract_qualification(text),
+        "experience_years": extract_experience(text),
+    }
+
 
 # -------------------- SBERT Embedding --------------------
 _EMB_MODEL = None
+_EMB_LOCK = threading.Lock()
 def _ensure_embedding_model():
     global _EMB_MODEL
-    if _EMB_MODEL is None:
-        try:
-            from sentence_transformers import SentenceTransformer
-            print("🔹 Loading SBERT model:", Config.EMBEDDING_MODEL)
-            _EMB_MODEL = SentenceTransformer(Config.EMBEDDING_MODEL)
-            print("✅ SBERT model loaded successfully.")
-        except Exception as e:
-            print("❌ ERROR loading SBERT model:", e)
-            raise RuntimeError(
-                "Embedding model not available. Install sentence-transformers and dependencies."
-            )
-
-def embed_texts(texts):
-    """Return list of embeddings for given texts."""
+    with _EMB_LOCK:
+        if _EMB_MODEL is None:
+            try:
+                from .embedding_backend import load_backend
+                print(f"🔹 Loading SBERT model: {Config.EMBEDDING_MODEL} ({Config.EMBEDDING_BACKEND} backend)")
+                _EMB_MODEL = load_backend()
+                print("✅ SBERT model loaded successfully.")
+            except Exception as e:
+                print("❌ ERROR loading SBERT model:", e)
+                raise RuntimeError(
+                    "Embedding model not available. Install sentence-transformers and dependencies."
+                )
+
+def warmup_embedding_model(verify=False):
+    """
+    Load the model and run one encode so the first upload doesn't pay for it. With verify,
+    a non-reference backend is checked against the torch model and replaced by it if the
+    similarities drift beyond EMBEDDING_VERIFY_TOLERANCE.
+    """
+    global _EMB_MODEL
     _ensure_embedding_model()
-    return _EMB_MODEL.encode(texts, convert_to_tensor=False)
+    _EMB_MODEL.encode(["warmup"], convert_to_tensor=False)
+    if verify and getattr(_EMB_MODEL, "name", "torch") != "torch":
+        from .embedding_backend import load_backend, verify_backend
+        reference = load_backend("torch")
+        ok, report = verify_backend(_EMB_MODEL, reference)
+        print("🔹 Embedding backend check:", report)
+        if not ok:
+            print("❌ Backend outside tolerance, falling back to torch.")
+            _EMB_MODEL = reference
+
+@timed("embed_texts")
+def embed_texts(texts):
+    """
+    Return an array of embeddings for given texts. Vectors are cached by normalized text,
+    model and backend name; only the misses are sent to the model, in token-budgeted batches.
+    """
+    from .cache import get_cache, text_key
+    cache = get_cache("embeddings")
+    # the loaded backend's name: warmup's verify may have fallen back to torch
+    backend = getattr(_EMB_MODEL, "name", None) or Config.EMBEDDING_BACKEND.lower()
+    model_key = f"{Config.EMBEDDING_MODEL}:{backend}" + ("|pooled" if Config.EMBEDDING_POOL_LONG else "")
+    keys = [text_key(t, model_key) for t in texts]
+    out = [cache.get(k) for k in keys]
+    missing = {}
+    for i, v in enumerate(out):
+        if v is None:
+            missing.setdefault(keys[i], []).append(i)
+    if missing:
+        from .embedding_backend import encode_batched
+        _ensure_embedding_model()
+        firsts = [idx[0] for idx in missing.values()]
+        encoded = encode_batched(_EMB_MODEL, [texts[i] for i in firsts])
+        for (key, idx), emb in zip(missing.items(), encoded):
+            emb = np.asarray(emb)
+            cache.put(key, emb)
+            for i in idx:
+                out[i] = emb
+    return np.vstack(out) if out else np.zeros((0, Config.EMBEDDING_DIM), dtype=np.float32)
+
+# -------------------- Embedding Encoding --------------------
+# Vectors are stored as a 12-byte header followed by the raw little-endian floats:
+# magic, format version, dtype code, dimension, crc32 tag of the model name.
+_EMB_MAGIC = b"SCVE"
+_EMB_VERSION = 1
+_EMB_HEADER = struct.Struct("<4sBBHI")
+_EMB_DTYPES = {1: np.dtype("<f4"), 2: np.dtype("<f2")}
+_EMB_DTYPE_CODES = {dt: code for code, dt in _EMB_DTYPES.items()}
+
+def embedding_model_tag(model_name=None):
+    return zlib.crc32((model_name or Config.EMBEDDING_MODEL).encode("utf8"))
+
+def encode_embedding(vec, dtype=None, model_name=None):
+    """Encode a vector as compact float32 (or float16) bytes with a dimension/model header."""
+    if vec is None:
+        return None
+    dt = np.dtype(dtype or Config.EMBEDDING_DTYPE).newbyteorder("<")
+    if dt not in _EMB_DTYPE_CODES:
+        raise ValueError(f"Unsupported embedding dtype: {dt}")
+    arr = np.asarray(vec, dtype=dt).ravel()
+    if Config.EMBEDDING_DIM and arr.size != Config.EMBEDDING_DIM:
+        raise ValueError(f"Expected {Config.EMBEDDING_DIM}-dim embedding, got {arr.size}")
+    header = _EMB_HEADER.pack(_EMB_MAGIC, _EMB_VERSION, _EMB_DTYPE_CODES[dt], arr.size,
+                              embedding_model_tag(model_name))
+    return header + arr.tobytes()
+
+def is_encoded_embedding(blob):
+    return isinstance(blob, (bytes, bytearray, memoryview)) and bytes(blob[:4]) == _EMB_MAGIC
+
+def decode_embedding(blob, model_name=None):
+    """
+    Decode a stored embedding without copying (np.frombuffer over the column bytes).
+    Legacy values (JSON text, optionally pickled by the old PickleType column) are still
+    accepted. Pass model_name to reject vectors produced by a different model.
+    """
+    if blob is None:
+        return None
+    if is_encoded_embedding(blob):
+        magic, version, code, dim, tag = _EMB_HEADER.unpack_from(blob)
+        if version != _EMB_VERSION or code not in _EMB_DTYPES:
+            raise ValueError("Unknown embedding encoding")
+        if model_name and tag != embedding_model_tag(model_name):
+            raise ValueError(f"Embedding was not produced by {model_name}")
+        return np.frombuffer(blob, dtype=_EMB_DTYPES[code], count=dim, offset=_EMB_HEADER.size)
+    if isinstance(blob, (bytes, bytearray, memoryview)):
+        blob = pickle.loads(bytes(blob))
+    if isinstance(blob, str):
+        blob = json.loads(blob)
+    return np.asarray(blob, dtype=np.float64)
 
 # -------------------- Cosine Similarity --------------------
 def cosine_sim(a, b):
@@ -161,6 +374,17 @@ def cosine_sim(a, b):
         return 0.0
 
 # -------------------- Weighted Match Score --------------------
+# Stored scores carry this stamp; bump it whenever weights or feature extraction change
+SCORING_VERSION = 1
+
+MATCH_WEIGHTS = {
+    "embedding": 0.60,
+    "skills": 0.25,
+    "qualification": 0.10,
+    "experience": 0.05
+}
+
+@timed("compute_match_score")
 def compute_match_score(cand_emb, job_emb, skill_ratio, cand_text=None, job_text=None, job_title=""):
     
         emb_sim = 0.0
@@ -189,12 +413,7 @@ def compute_match_score(cand_emb, job_emb, skill_ratio, cand_text=None, job_text
             exp_score = 0.5  # partial if no job exp mentioned
 
         # --- Weights (rebalanced) ---
-        weights = {
-            "embedding": 0.60,
-            "skills": 0.25,
-            "qualification": 0.10,
-            "experience": 0.05
-        }
+        weights = MATCH_WEIGHTS
 
         final_score = (
             weights["embedding"] * emb_sim +
@@ -214,6 +433,85 @@ def compute_match_score(cand_emb, job_emb, skill_ratio, cand_text=None, job_text
         return round(final_score, 4), contributions
 
 
+# -------------------- Batch Scoring --------------------
+# (candidate qualification, job qualification) pairs that earn partial credit
+_PARTIAL_QUALIFICATIONS = [("master", "bachelor"), ("phd", "master"), ("bachelor", "master")]
+
+def skill_overlap_ratios(job_skills, cand_skill_lists):
+    """Fraction of the job's skills present in each candidate's skill list."""
+    job_skills = list(job_skills or [])
+    if not job_skills:
+        return np.zeros(len(cand_skill_lists))
+    job_set = set(job_skills)
+    overlaps = [len(job_set.intersection(s or [])) for s in cand_skill_lists]
+    return np.asarray(overlaps, dtype=np.float64) / max(1, len(job_skills))
+
+def job_skill_ratios(job_skill_lists, cand_skills):
+    """For one candidate: fraction of each job's skills the candidate has."""
+    cand_set = set(cand_skills or [])
+    return np.asarray([
+        len(cand_set.intersection(js)) / max(1, len(js)) if js else 0.0
+        for js in job_skill_lists
+    ], dtype=np.float64)
+
+def stack_embeddings(embs, dim=None, dtype=np.float64):
+    """Stack embeddings into a float matrix; missing vectors become zero rows."""
+    if dim is None:
+        dim = next((len(e) for e in embs if e is not None), 0)
+    matrix = np.zeros((len(embs), dim), dtype=dtype)
+    for i, e in enumerate(embs):
+        if e is not None:
+            matrix[i] = e
+    return matrix
+
+def cosine_sim_matrix(cand_embs, job_emb):
+    """Cosine similarity of every candidate row against one job vector (0 for zero vectors)."""
+    cand = np.asarray(cand_embs)
+    if cand.dtype not in (np.float32, np.float64):
+        cand = cand.astype(np.float64)
+    if job_emb is None or cand.size == 0:
+        return np.zeros(len(cand))
+    job = np.asarray(job_emb, dtype=cand.dtype)
+    norms = np.linalg.norm(cand, axis=1) * np.linalg.norm(job)
+    sims = np.zeros(len(cand))
+    np.divide(cand @ job, norms, out=sims, where=norms > 0)
+    return sims
+
+def qualification_scores(cand_quals, job_qual):
+    """Vectorized qualification component; arguments broadcast against each other."""
+    cq = np.asarray(cand_quals, dtype=object)
+    jq = np.asarray(job_qual, dtype=object)
+    exact = (cq == jq) & (jq != "unknown")
+    partial = np.zeros(np.broadcast(cq, jq).shape, dtype=bool)
+    for c, j in _PARTIAL_QUALIFICATIONS:
+        partial |= (cq == c) & (jq == j)
+    return np.where(exact, 1.0, np.where(partial, 0.8, 0.0))
+
+def experience_scores(cand_exps, job_exp):
+    """Vectorized experience component; 0.5 when the job states no experience."""
+    ce = np.asarray(cand_exps, dtype=np.float64)
+    je = np.asarray(job_exp, dtype=np.float64)
+    safe_je = np.where(je > 0, je, 1.0)
+    return np.where(je > 0, np.minimum(ce, je) / safe_je, 0.5)
+
+def weighted_scores(emb_sim, skill_score, qual_score, exp_score):
+    """Combine component arrays with MATCH_WEIGHTS; same rounding as compute_match_score."""
+    skill_score = np.asarray(skill_score, dtype=np.float64)
+    weights = MATCH_WEIGHTS
+    final_score = (
+        weights["embedding"] * emb_sim +
+        weights["skills"] * skill_score +
+        weights["qualification"] * qual_score +
+        weights["experience"] * exp_score
+    )
+    contributions = {
+        "embedding": np.round(weights["embedding"] * emb_sim * 100, 2),
+        "skills": np.round(weights["skills"] * skill_score * 100, 2),
+        "qualification": np.round(weights["qualification"] * qual_score * 100, 2),
+        "experience": np.round(weights["experience"] * exp_score * 100, 2),
+    }
+    return np.round(final_score, 4), contributions
+
 
 # -------------------- Name & Email Extraction --------------------
 def extract_name_email(text):
@@ -0,0 +1,224 @@
+"""
+On-disk candidate embedding index shared by all worker processes.
+
+Layout under Config.DATA_DIR/index:
+ - vectors.npy  float32 matrix (capacity x dim), opened with np.memmap
+ - ids.npy      int64 candidate ids aligned with the matrix rows
+ - meta.json    number of valid rows, dimension and model tag
+
+Rows are appended in place and meta.json is replaced atomically afterwards, so readers
+only ever see fully written rows. The file grows by doubling its capacity.
+"""
+import os, json, contextlib
+import numpy as np
+from config import Config
+from .utils import decode_embedding, embedding_model_tag
+
+try:
+    import fcntl
+except ImportError:  # non-POSIX: single-process use only
+    fcntl = None
+
+_INITIAL_CAPACITY = 1024
+
+
+class CandidateIndex:
+    def __init__(self, root=None, dim=None):
+        self.root = root or os.path.join(Config.DATA_DIR, "index")
+        self.dim = dim or Config.EMBEDDING_DIM
+        self.vectors_path = os.path.join(self.root, "vectors.npy")
+        self.ids_path = os.path.join(self.root, "ids.npy")
+        self.meta_path = os.path.join(self.root, "meta.json")
+        self._meta_mtime = None
+        self._meta = None
+        self._vectors = None
+        self._ids = None
+        self._positions = None
+
+    # ---------------- Reading ----------------
+    def _read_meta(self):
+        try:
+            with open(self.meta_path, "r", encoding="utf8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _refresh(self):
+        """Re-open the memory maps if another process changed the index."""
+        try:
+            mtime = os.stat(self.meta_path).st_mtime_ns
+        except OSError:
+            self._meta = self._vectors = self._ids = self._positions = None
+            self._meta_mtime = None
+            return False
+        if mtime != self._meta_mtime:
+            meta = self._read_meta()
+            if meta is None:
+                return False
+            self._meta = meta
+            self._vectors = np.load(self.vectors_path, mmap_mode="r")
+            self._ids = np.load(self.ids_path, mmap_mode="r")
+            self._positions = None
+            self._meta_mtime = mtime
+        return True
+
+    def exists(self):
+        return self._refresh()
+
+    @property
+    def count(self):
+        return self._meta["count"] if self._refresh() else 0
+
+    def matrix(self):
+        """Return (ids, vectors) views over the valid rows; both are read-only memmaps."""
+        if not self._refresh():
+            return np.zeros(0, dtype=np.int64), np.zeros((0, self.dim), dtype=np.float32)
+        n = self._meta["count"]
+        return self._ids[:n], self._vectors[:n]
+
+    def lookup(self, cand_ids):
+        """Map candidate ids to matrix rows; returns (positions, found_mask)."""
+        ids, _ = self.matrix()
+        if self._positions is None:
+            self._positions = {int(i): p for p, i in enumerate(ids)}
+        positions = np.array([self._positions.get(int(c), -1) for c in cand_ids], dtype=np.int64)
+        return positions, positions >= 0
+
+    def is_stale(self, db_count, db_max_id, model_name=None):
+        if not self._refresh():
+            return True
+        meta = self._meta
+        return (
+            meta.get("dim") != self.dim
+            or meta.get("model_tag") != embedding_model_tag(model_name)
+            or meta["count"] != db_count
+            or meta.get("max_id") != db_max_id
+        )
+
+    # ---------------- Writing ----------------
+    @contextlib.contextmanager
+    def _locked(self):
+        os.makedirs(self.root, exist_ok=True)
+        with open(os.path.join(self.root, ".lock"), "a") as lock:
+            if fcntl:
+                fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl:
+                    fcntl.flock(lock, fcntl.LOCK_UN)
+
+    def _write_meta(self, count, capacity, max_id):
+        meta = {
+            "count": int(count),
+            "capacity": int(capacity),
+            "dim": self.dim,
+            "max_id": int(max_id) if max_id is not None else None,
+            "model": Config.EMBEDDING_MODEL,
+            "model_tag": embedding_model_tag(),
+        }
+        tmp = self.meta_path + ".tmp"
+        with open(tmp, "w", encoding="utf8") as f:
+            json.dump(meta, f)
+        os.replace(tmp, self.meta_path)
+
+    def _allocate(self, capacity, suffix=".tmp"):
+        vectors = np.lib.format.open_memmap(self.vectors_path + suffix, mode="w+",
+                                            dtype=np.float32, shape=(capacity, self.dim))
+        ids = np.lib.format.open_memmap(self.ids_path + suffix, mode="w+",
+                                        dtype=np.int64, shape=(capacity,))
+        return vectors, ids
+
+    def _install(self, vectors, ids, suffix=".tmp"):
+        vectors.flush(); ids.flush()
+        del vectors, ids
+        os.replace(self.vectors_path + suffix, self.vectors_path)
+        os.replace(self.ids_path + suffix, self.ids_path)
+
+    def append(self, cand_id, vec):
+        """Append one candidate vector. Returns False if the index has not been built yet."""
+        if vec is None:
+            return False
+        with self._locked():
+            meta = self._read_meta()
+            if meta is None or meta.get("dim") != self.dim:
+                return False
+            count, capacity = meta["count"], meta["capacity"]
+            if count >= capacity:
+                old_vectors = np.load(self.vectors_path, mmap_mode="r")
+                old_ids = np.load(self.ids_path, mmap_mode="r")
+                capacity = max(_INITIAL_CAPACITY, capacity * 2)
+                vectors, ids = self._allocate(capacity)
+                vectors[:count] = old_vectors[:count]
+                ids[:count] = old_ids[:count]
+                del old_vectors, old_ids
+                self._install(vectors, ids)
+            vectors = np.load(self.vectors_path, mmap_mode="r+")
+            ids = np.load(self.ids_path, mmap_mode="r+")
+            vectors[count] = np.asarray(vec, dtype=np.float32)
+            ids[count] = cand_id
+            vectors.flush(); ids.flush()
+            del vectors, ids
+            max_id = max(meta.get("max_id") or 0, int(cand_id))
+            self._write_meta(count + 1, capacity, max_id)
+        return True
+
+    def rebuild(self, rows, total):
+        """Rewrite the index from an iterable of (candidate_id, vector) pairs."""
+        with self._locked():
+            capacity = max(_INITIAL_CAPACITY, int(total))
+            vectors, ids = self._allocate(capacity)
+            count, max_id = 0, None
+            for cand_id, vec in rows:
+                if count >= capacity:
+                    break
+                vectors[count] = np.asarray(vec, dtype=np.float32)
+                ids[count] = cand_id
+                max_id = cand_id if max_id is None else max(max_id, cand_id)
+                count += 1
+            self._install(vectors, ids)
+            self._write_meta(count, capacity, max_id)
+        return count
+
+
+# ---------------------------------------------------------------
+# Process-wide index and database synchronisation
+# ---------------------------------------------------------------
+_INDEX = None
+
+def get_candidate_index():
+    global _INDEX
+    if _INDEX is None:
+        _INDEX = CandidateIndex()
+    return _INDEX
+
+def _iter_candidate_embeddings(batch=1000):
+    from . import db
+    from .models import Candidate
+    last_id = 0
+    while True:
+        rows = db.session.execute(
+            db.select(Candidate.id, Candidate.embedding)
+            .where(Candidate.id > last_id, Candidate.embedding.isnot(None))
+            .order_by(Candidate.id)
+            .limit(batch)
+        ).all()
+        if not rows:
+            return
+        for cand_id, blob in rows:
+            yield cand_id, decode_embedding(blob)
+        last_id = rows[-1][0]
+
+def sync_candidate_index(index=None):
+    """Rebuild the index from the candidates table when it is missing or out of date."""
+    from . import db
+    from .models import Candidate
+    index = index or get_candidate_index()
+    db_count, db_max_id = db.session.execute(
+        db.select(db.func.count(Candidate.id), db.func.max(Candidate.id))
+        .where(Candidate.embedding.isnot(None))
+    ).one()
+    if index.is_stale(db_count, db_max_id):
+        print(f"🔹 Rebuilding candidate index ({db_count} vectors)")
+        index.rebuild(_iter_candidate_embeddings(), db_count)
+    return index
@@ -10,3 +10,44 @@ class Config:
     BASE_DIR = os.path.dirname(__file__)
     DATA_DIR = os.environ.get("DATA_DIR", os.path.join(BASE_DIR, "data"))
     EMBEDDING_MODEL = os.environ.get("EMBEDDING_MODEL", "sentence-transformers/all-MiniLM-L6-v2")
+    EMBEDDING_DIM = int(os.environ.get("EMBEDDING_DIM", "384"))
+    EMBEDDING_BACKEND = os.environ.get("EMBEDDING_BACKEND", "torch")  # torch / int8 / onnx
+    EMBEDDING_ONNX_FILE = os.environ.get("EMBEDDING_ONNX_FILE", "")  # e.g. onnx/model_qint8_avx512_vnni.onnx
+    EMBEDDING_THREADS = int(os.environ.get("EMBEDDING_THREADS", "0"))  # 0 = torch default
+    EMBEDDING_TOKEN_BUDGET = int(os.environ.get("EMBEDDING_TOKEN_BUDGET", "8192"))  # padded tokens per batch
+    EMBEDDING_POOL_LONG = os.environ.get("EMBEDDING_POOL_LONG", "1") == "1"  # chunk + pool texts past the model window
+    EMBEDDING_WARMUP = os.environ.get("EMBEDDING_WARMUP", "0") == "1"
+    EMBEDDING_VERIFY = os.environ.get("EMBEDDING_VERIFY", "0") == "1"
+    EMBEDDING_VERIFY_TOLERANCE = float(os.environ.get("EMBEDDING_VERIFY_TOLERANCE", "0.02"))
+    EMBEDDING_DTYPE = os.environ.get("EMBEDDING_DTYPE", "float32")  # or float16
+    INGEST_WORKERS = int(os.environ.get("INGEST_WORKERS", "2"))  # 0 = process uploads in the request
+    INGEST_QUEUE_SIZE = int(os.environ.get("INGEST_QUEUE_SIZE", "32"))
+    INGEST_TIMEOUT = float(os.environ.get("INGEST_TIMEOUT", "600"))  # seconds before a pending upload is reported failed
+    CACHE_DIR = os.environ.get("CACHE_DIR", os.path.join(DATA_DIR, "cache"))
+    CACHE_MAX_BYTES = int(os.environ.get("CACHE_MAX_BYTES", str(1024 * 1024 * 1024)))  # 0 disables the disk tier
+    CACHE_MEMORY_ITEMS = int(os.environ.get("CACHE_MEMORY_ITEMS", "1024"))
+    CRAWLER_BASE_URL = os.environ.get("CRAWLER_BASE_URL", "https://www.naukri.com")
+    CRAWLER_PAGES = int(os.environ.get("CRAWLER_PAGES", "3"))  # result pages per query
+    CRAWLER_MAX_QUERIES = int(os.environ.get("CRAWLER_MAX_QUERIES", "4"))  # skill combinations per search
+    CRAWLER_WORKERS = int(os.environ.get("CRAWLER_WORKERS", "8"))
+    CRAWLER_PER_HOST = int(os.environ.get("CRAWLER_PER_HOST", "4"))
+    CRAWLER_TIMEOUT = float(os.environ.get("CRAWLER_TIMEOUT", "5"))  # per request, seconds
+    CRAWLER_DEADLINE = float(os.environ.get("CRAWLER_DEADLINE", "8"))  # whole search, seconds
+    SEARCH_CACHE_TTL = float(os.environ.get("SEARCH_CACHE_TTL", "600"))  # seconds a search result is fresh
+    SEARCH_CACHE_STALE = float(os.environ.get("SEARCH_CACHE_STALE", "3600"))  # then served stale while refreshing
+    SEARCH_CACHE_NEGATIVE_TTL = float(os.environ.get("SEARCH_CACHE_NEGATIVE_TTL", "30"))  # seconds for failed / empty crawls
+    SEARCH_CACHE_SIZE = int(os.environ.get("SEARCH_CACHE_SIZE", "512"))
+    JOB_CATALOG_CSV = os.environ.get("JOB_CATALOG_CSV", os.path.join(DATA_DIR, "job_title_des.csv"))
+    JOB_CATALOG_TOP_K = int(os.environ.get("JOB_CATALOG_TOP_K", "10"))
+    RECOMMEND_TOP_K = int(os.environ.get("RECOMMEND_TOP_K", "10"))  # jobs recommended per resume
+    RECOMMEND_MAX_K = int(os.environ.get("RECOMMEND_MAX_K", "100"))
+    SHORTLIST_PAGE_SIZE = int(os.environ.get("SHORTLIST_PAGE_SIZE", "50"))
+    SHORTLIST_MAX_PAGE_SIZE = int(os.environ.get("SHORTLIST_MAX_PAGE_SIZE", "500"))
+    SHORTLIST_TOP_K = int(os.environ.get("SHORTLIST_TOP_K", "0"))  # 0 = the whole ranking is browsable
+    SHORTLIST_MIN_SCORE = float(os.environ.get("SHORTLIST_MIN_SCORE", "0"))  # percent
+    MATCH_PREFILTER_MIN_SKILLS = int(os.environ.get("MATCH_PREFILTER_MIN_SKILLS", "0"))  # 0 with TOP_N 0 = score everyone
+    MATCH_PREFILTER_TOP_N = int(os.environ.get("MATCH_PREFILTER_TOP_N", "0"))  # rerank only the N best skill overlaps
+    METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "1") == "1"
+    METRICS_TIMING_HEADER = os.environ.get("METRICS_TIMING_HEADER", "0") == "1"  # Server-Timing on every response
+    SCORING_MODE = os.environ.get("SCORING_MODE", "weights")  # weights / matcher
+    MATCHER_MODEL_PATH = os.environ.get("MATCHER_MODEL_PATH", os.path.join(DATA_DIR, "matcher_rf.pkl"))
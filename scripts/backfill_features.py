@@ -0,0 +1,60 @@
+"""
+Populate the ingest-time feature columns (qualification, experience_years, skills)
+for candidates and jobs stored before they existed, and rebuild the candidate_skills
+posting lists from the result.
+Adds any missing columns to existing tables first, so run this before starting the app
+against an older database.
+Usage: python -m scripts.backfill_features [--all] [--batch 500]
+"""
+import argparse, json, time
+from app import create_app, db
+from app.models import Candidate, Job, Application
+from app.utils import extract_features
+from app.skill_index import rebuild_skill_index
+from scripts.init_db import upgrade_schema
+
+def backfill(model, text_attr, skills_attr, recompute_all, batch):
+    text_col = getattr(model, text_attr)
+    updated, last_id = 0, 0
+    while True:
+        query = db.select(model.id, text_col).where(model.id > last_id)
+        if not recompute_all:
+            query = query.where(model.experience_years.is_(None))
+        rows = db.session.execute(query.order_by(model.id).limit(batch)).all()
+        if not rows:
+            break
+        updates = []
+        for row_id, text in rows:
+            features = extract_features(text or "")
+            updates.append({
+                "id": row_id,
+                skills_attr: json.dumps(features["skills"]),
+                "qualification": features["qualification"],
+                "experience_years": features["experience_years"],
+            })
+            if model is Job:
+                # running apps reload their recommendation matrix (app.job_index)
+                updates[-1]["features_updated_at"] = time.time()
+        db.session.execute(db.update(model), updates)
+        db.session.commit()
+        updated += len(updates)
+        last_id = rows[-1][0]
+    print(f"{model.__tablename__}: backfilled {updated} rows")
+    return updated
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--all", action="store_true", help="recompute rows that already have features")
+    parser.add_argument("--batch", type=int, default=500)
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        upgrade_schema()
+        updated = backfill(Candidate, "resume_text", "skills_json", args.all, args.batch)
+        print(f"candidate_skills: indexed {rebuild_skill_index()} candidates")
+        updated += backfill(Job, "description", "skills_required", args.all, args.batch)
+        if updated:
+            # stored scores were computed from the old features; mark them for recompute
+            db.session.execute(db.update(Application).values(scoring_version=None))
+            db.session.commit()
@@ -0,0 +1,119 @@
+"""
+Memory and time of loading candidate scoring inputs for several jobs, on the candidates
+in the configured database:
+ - all_entities:     Candidate.query.all() with every column, skills and embedding
+                     decoded again for each job (how download_results used to work)
+ - deferred_batches: ORM batches without resume text / embedding, re-read per job
+                     (how refresh_stale_scores scored one job at a time)
+ - projected_stream: app.candidate_data batches of the scoring columns, streamed once
+                     and decoded once for all jobs
+Peak memory is Python allocations traced with tracemalloc, in a second run so the tracing
+does not skew the timings. Also times counting the scorable pool with and without a filter
+the ix_candidates_scorable index can serve.
+Nothing is written to the database.
+Usage: python -m scripts.bench_candidate_loading [--jobs 10] [--batch 5000]
+"""
+import gc, json, time, argparse, tracemalloc
+from sqlalchemy import event
+from app import create_app, db
+from app.models import Candidate
+from app.utils import decode_embedding
+from app.candidate_data import SCORABLE, CandidateBatch, iter_candidate_batches
+
+
+def all_entities(n_jobs, batch):
+    candidates = Candidate.query.all()
+    for _ in range(n_jobs):
+        for c in candidates:
+            json.loads(c.skills_json or "[]")
+            decode_embedding(c.embedding)
+    return len(candidates)
+
+
+def deferred_batches(n_jobs, batch):
+    total = 0
+    query = (
+        Candidate.query
+        .options(db.defer(Candidate.embedding), db.defer(Candidate.resume_text))
+        .filter(*SCORABLE)
+    )
+    for _ in range(n_jobs):
+        last_id = 0
+        while True:
+            candidates = query.filter(Candidate.id > last_id).order_by(Candidate.id).limit(batch).all()
+            if not candidates:
+                break
+            CandidateBatch(candidates)
+            total += len(candidates)
+            last_id = candidates[-1].id
+    return total // max(n_jobs, 1)
+
+
+def projected_stream(n_jobs, batch):
+    return sum(len(b) for b in iter_candidate_batches(batch))
+
+
+def run(fn, n_jobs, batch, trace=False):
+    db.session.expunge_all()
+    gc.collect()
+    if trace:
+        tracemalloc.start()
+    start = time.perf_counter()
+    try:
+        rows = fn(n_jobs, batch)
+        db.session.commit()
+    finally:
+        seconds = time.perf_counter() - start
+        peak = tracemalloc.get_traced_memory()[1] if trace else 0
+        if trace:
+            tracemalloc.stop()
+    db.session.expunge_all()
+    return rows, seconds, peak / 2**20
+
+
+def measure(fn, n_jobs, batch):
+    """(rows, seconds, peak MB, queries); time and memory come from separate runs."""
+    queries = [0]
+    def count(*_):
+        queries[0] += 1
+    event.listen(db.engine, "before_cursor_execute", count)
+    try:
+        rows, seconds, _ = run(fn, n_jobs, batch)
+    finally:
+        event.remove(db.engine, "before_cursor_execute", count)
+    _, _, peak = run(fn, n_jobs, batch, trace=True)
+    return rows, seconds, peak, queries[0]
+
+
+def time_count(where, repeat=5):
+    query = db.select(db.func.count(Candidate.id)).where(*where)
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        db.session.execute(query).scalar()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--jobs", type=int, default=10, help="jobs the inputs are prepared for")
+    parser.add_argument("--batch", type=int, default=5000)
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        print(f"{'strategy':<20}{'rows':>9}{'seconds':>10}{'peak MB':>10}{'queries':>9}")
+        for fn in (all_entities, deferred_batches, projected_stream):
+            rows, seconds, peak, queries = measure(fn, args.jobs, args.batch)
+            print(f"{fn.__name__:<20}{rows:>9}{seconds:>10.2f}{peak:>10.1f}{queries:>9}")
+
+        # a bound '' parameter hides the partial index's predicate from the planner
+        unindexed = (Candidate.resume_text.isnot(None), Candidate.resume_text != "")
+        print(f"count scorable: {time_count(SCORABLE):.1f} ms with the partial index, "
+              f"{time_count(unindexed):.1f} ms scanning resume_text")
+        if db.engine.dialect.name == "sqlite":
+            sql = db.select(db.func.count(Candidate.id)).where(*SCORABLE).compile(
+                db.engine, compile_kwargs={"literal_binds": True})
+            plan = db.session.execute(db.text(f"EXPLAIN QUERY PLAN {sql}")).all()
+            print("plan:", "; ".join(row[-1] for row in plan))
@@ -0,0 +1,71 @@
+"""
+Recall vs latency of two-stage matching (skill prefilter + embedding rerank) against
+exhaustive scoring, on the jobs and candidates in the configured database.
+For each job the exhaustive top-k is the reference; recall@k is the share of it that the
+prefiltered ranking also returns. Nothing is written to the applications table.
+Usage: python -m scripts.bench_prefilter [--k 50] [--jobs 20] [--min-skills 1 2] [--top-n 500 2000]
+"""
+import time, argparse
+import numpy as np
+from app import create_app, db
+from app.models import Job
+from app.scoring import iter_job_scores
+from app.skill_index import prefilter_candidate_ids
+from app.vector_index import sync_candidate_index
+
+
+def rank(job, index, candidate_ids=None):
+    """(ids sorted best first, seconds) for one job, including the prefilter query."""
+    start = time.perf_counter()
+    if candidate_ids is not None:
+        candidate_ids = candidate_ids()
+    ids, scores = [], []
+    for cand_ids, batch_scores, _ in iter_job_scores(job, candidate_ids=candidate_ids, index=index):
+        ids.extend(cand_ids)
+        scores.append(batch_scores)
+    scores = np.concatenate(scores) if scores else np.zeros(0)
+    order = np.lexsort((np.asarray(ids), -scores))
+    return [ids[i] for i in order], time.perf_counter() - start
+
+
+def report(jobs, index, settings, k):
+    exhaustive = {job.id: rank(job, index) for job in jobs}
+    base_ms = np.mean([t for _, t in exhaustive.values()]) * 1000
+    print(f"{'setting':<24}{'recall@' + str(k):>10}{'ms/job':>10}{'scored':>10}{'speedup':>9}")
+    print(f"{'exhaustive':<24}{1.0:>10.3f}{base_ms:>10.1f}{np.mean([len(r) for r, _ in exhaustive.values()]):>10.0f}{1.0:>9.1f}")
+    for label, min_shared, top_n in settings:
+        recalls, times, sizes = [], [], []
+        for job in jobs:
+            ranked, seconds = rank(job, index, lambda: prefilter_candidate_ids(job.skill_list(), min_shared, top_n))
+            reference = set(exhaustive[job.id][0][:k])
+            if reference:
+                recalls.append(len(reference & set(ranked[:k])) / len(reference))
+            times.append(seconds)
+            sizes.append(len(ranked))
+        ms = np.mean(times) * 1000
+        print(f"{label:<24}{np.mean(recalls) if recalls else 0:>10.3f}{ms:>10.1f}{np.mean(sizes):>10.0f}{base_ms / ms:>9.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--k", type=int, default=50)
+    parser.add_argument("--jobs", type=int, default=20, help="most recent jobs to evaluate")
+    parser.add_argument("--min-skills", type=int, nargs="*", default=[1, 2])
+    parser.add_argument("--top-n", type=int, nargs="*", default=[500, 2000])
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        jobs = (
+            Job.query.options(db.defer(Job.description))
+            .order_by(Job.id.desc()).limit(args.jobs).all()
+        )
+        jobs = [j for j in jobs if j.skill_list()]
+        if not jobs:
+            raise SystemExit("No jobs with extracted skills to evaluate.")
+        index = sync_candidate_index()
+        settings = [(f"min_skills={m}", m, 0) for m in args.min_skills]
+        settings += [(f"top_n={n}", 0, n) for n in args.top_n]
+        settings += [(f"min_skills={m},top_n={n}", m, n) for m in args.min_skills for n in args.top_n]
+        print(f"{len(jobs)} jobs, k={args.k}")
+        report(jobs, index, settings, args.k)
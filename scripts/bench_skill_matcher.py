@@ -0,0 +1,74 @@
+"""
+Benchmark the compiled SkillMatcher against the original per-alias regex loop.
+Taxonomies of 100, 1k and 10k skills are built from skills_with_aliases_100.csv plus
+synthetic skills; texts come from AI_Resume_Screening_final.csv with aliases sprinkled in.
+Usage: python -m scripts.bench_skill_matcher [--texts 200] [--sizes 100 1000 10000]
+"""
+import os, re, time, random, argparse
+import pandas as pd
+from config import Config
+from app.utils import load_skill_aliases, SkillMatcher
+
+def legacy_extract(text, skill_map):
+    found = set()
+    text_l = (text or "").lower()
+    for canonical, aliases in skill_map.items():
+        for a in aliases:
+            if re.search(r'\b' + re.escape(a) + r'\b', text_l):
+                found.add(canonical)
+                break
+    return sorted(found)
+
+def build_taxonomy(base, size, rng):
+    skill_map = dict(list(base.items())[:size])
+    syllables = ["data", "cloud", "net", "script", "flow", "graph", "ops", "base", "lang", "kit", "hub", "core"]
+    i = 0
+    while len(skill_map) < size:
+        name = "".join(rng.sample(syllables, 2)) + str(i)
+        skill_map[name] = [name, name + " framework", name[:4] + "-" + str(i)]
+        i += 1
+    return skill_map
+
+def build_texts(skill_map, n, rng):
+    df = pd.read_csv(os.path.join(Config.DATA_DIR, "AI_Resume_Screening_final.csv"), engine="python")
+    rows = df.fillna("").astype(str).agg(" ".join, axis=1).tolist()
+    aliases = [a for al in skill_map.values() for a in al]
+    texts = []
+    for i in range(n):
+        words = rows[i % len(rows)].split() * 20
+        for a in rng.sample(aliases, min(15, len(aliases))):
+            words.insert(rng.randrange(len(words)), a)
+        texts.append(" ".join(words))
+    return texts
+
+def throughput(fn, texts, budget):
+    start, done = time.perf_counter(), 0
+    for t in texts:
+        fn(t)
+        done += 1
+        if time.perf_counter() - start > budget:
+            break
+    return done / (time.perf_counter() - start)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--texts", type=int, default=200)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument("--budget", type=float, default=10.0, help="max seconds per measurement")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    base = load_skill_aliases(os.path.join(Config.DATA_DIR, "skills_with_aliases_100.csv"))
+    print(f"{'skills':>8} {'aliases':>8} {'build s':>8} {'legacy/s':>10} {'compiled/s':>11} {'speedup':>8}")
+    for size in args.sizes:
+        skill_map = build_taxonomy(base, size, rng)
+        texts = build_texts(skill_map, args.texts, rng)
+        t0 = time.perf_counter()
+        matcher = SkillMatcher(skill_map)
+        build = time.perf_counter() - t0
+        for t in texts[:20]:
+            assert matcher.find(t) == legacy_extract(t, skill_map), "matcher disagrees with legacy loop"
+        legacy = throughput(lambda t: legacy_extract(t, skill_map), texts, args.budget)
+        compiled = throughput(matcher.find, texts, args.budget)
+        n_aliases = sum(len(a) for a in skill_map.values())
+        print(f"{size:>8} {n_aliases:>8} {build:>8.2f} {legacy:>10.1f} {compiled:>11.1f} {compiled / legacy:>7.1f}x")
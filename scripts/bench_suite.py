@@ -0,0 +1,250 @@
+"""
+Reproducible performance benchmarks for feature extraction, ingest, scoring, the shortlist
+and the CSV export, at several candidate pool sizes.
+
+Synthetic resumes and job descriptions are generated from AI_Resume_Screening_final.csv
+and the skill taxonomy with a fixed seed. Embeddings are deterministic stubs (a random
+vector per skill, summed, plus noise), so no model is loaded. Each size runs against a
+fresh SQLite database and data directory in a temp folder unless --database-url is given.
+Results are written as JSON; pass --compare with an earlier file to print the ratios.
+Usage: python -m scripts.bench_suite [--sizes 1000 10000 100000] [--jobs 3] [--out results.json]
+                                     [--compare old.json]
+"""
+import os, sys, json, time, random, shutil, argparse, platform, subprocess, tempfile
+import numpy as np
+import pandas as pd
+from config import Config
+
+
+# ---------------------------------------------------------------
+# Synthetic data
+# ---------------------------------------------------------------
+EDUCATION_PHRASES = {
+    "B.Sc": "B.Sc in Computer Science", "B.Tech": "B.Tech in Information Technology",
+    "M.Tech": "M.Tech in Data Science", "MBA": "MBA", "PhD": "PhD in Machine Learning",
+}
+
+
+def load_seed_rows():
+    df = pd.read_csv(os.path.join(Config.DATA_DIR, "AI_Resume_Screening_final.csv"), engine="python")
+    return df.fillna("").to_dict("records")
+
+
+def resume_text(row, extra_aliases, rng):
+    education = EDUCATION_PHRASES.get(str(row["Education"]), str(row["Education"]))
+    years = int(row["Experience (Years)"] or 0) + rng.randint(0, 3)
+    lines = [
+        f"{row['Name']} {rng.randint(1, 99999)}",
+        f"{row['Job Role']} with {years} years of experience.",
+        f"Skills: {row['Skills']}, {', '.join(extra_aliases)}",
+        f"Education: {education}",
+        f"Certifications: {row['Certifications']}",
+        f"Delivered {row['Projects Count']} projects.",
+    ]
+    return "\n".join(lines)
+
+
+def job_text(row, extra_aliases, rng):
+    return (
+        f"We are hiring a {row['Job Role']}. Required skills: {row['Skills']}, {', '.join(extra_aliases)}. "
+        f"Minimum {rng.randint(0, 8)} years of experience. "
+        f"{EDUCATION_PHRASES.get(str(row['Education']), str(row['Education']))} preferred."
+    )
+
+
+def make_texts(n, seed_rows, aliases, rng, builder):
+    return [builder(rng.choice(seed_rows), rng.sample(aliases, rng.randint(0, 4)), rng) for _ in range(n)]
+
+
+class StubEmbedder:
+    """Deterministic embeddings: similar skill sets give similar vectors."""
+    def __init__(self, skills, dim, seed):
+        self.rng = np.random.default_rng(seed)
+        self.dim = dim
+        self.skill_vectors = {s: self.rng.standard_normal(dim).astype(np.float32) for s in sorted(skills)}
+
+    def __call__(self, skills):
+        vec = self.rng.standard_normal(self.dim).astype(np.float32) * 2.0
+        for s in skills:
+            vec += self.skill_vectors.get(s, 0.0)
+        return vec / np.linalg.norm(vec)
+
+
+# ---------------------------------------------------------------
+# Timing
+# ---------------------------------------------------------------
+def timed(results, name, n, fn, repeat=1):
+    """Run fn repeat times and keep the fastest run (only for steps without side effects)."""
+    seconds = float("inf")
+    for _ in range(max(1, repeat)):
+        start = time.perf_counter()
+        value = fn()
+        seconds = min(seconds, time.perf_counter() - start)
+    results[name] = {"seconds": round(seconds, 4), "n": n, "per_item_us": round(seconds / max(n, 1) * 1e6, 2)}
+    print(f"  {name:<34}{seconds:>9.3f}s  {results[name]['per_item_us']:>10.1f} us/item  (n={n})")
+    return value
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], cwd=Config.BASE_DIR,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_size(n, args, seed_rows, skill_map, work_dir):
+    # point the app at a private database and data directory before it is created
+    data_dir = os.path.join(work_dir, f"n{n}")
+    os.makedirs(data_dir, exist_ok=True)
+    Config.DATA_DIR = data_dir
+    Config.CACHE_DIR = os.path.join(data_dir, "cache")
+    Config.SQLALCHEMY_DATABASE_URI = args.database_url or f"sqlite:///{os.path.join(data_dir, 'bench.db')}"
+    Config.EMBEDDING_WARMUP = False
+    Config.INGEST_WORKERS = 0
+
+    from app import create_app, db
+    from app.models import Candidate, Job
+    from app.utils import (
+        extract_skills_from_text, extract_experience, extract_qualification, extract_features,
+        compute_match_score, skill_overlap_ratios, encode_embedding
+    )
+    from app.skill_index import add_candidate_skills
+    from app.vector_index import sync_candidate_index
+    from app.scoring import score_job_against_candidates, ranking_page
+    from app import vector_index
+    vector_index._INDEX = None  # the shared index lives under the previous size's DATA_DIR
+
+    rng = random.Random(args.seed + n)
+    aliases = sorted({a for values in skill_map.values() for a in values})
+    embed = StubEmbedder(skill_map.keys(), Config.EMBEDDING_DIM, args.seed)
+    results = {}
+
+    resumes = make_texts(n, seed_rows, aliases, rng, resume_text)
+    job_texts = make_texts(args.jobs, seed_rows, aliases, rng, job_text)
+
+    cand_skills = timed(results, "extract_skills_from_text", n,
+                        lambda: [extract_skills_from_text(t, skill_map) for t in resumes], args.repeat)
+    exp_qual = timed(results, "extract_experience_qualification", n,
+                     lambda: [(extract_experience(t), extract_qualification(t)) for t in resumes], args.repeat)
+    cand_embs = [embed(s) for s in cand_skills]
+    job_features = [extract_features(t, skill_map) for t in job_texts]
+    job_embs = [embed(f["skills"]) for f in job_features]
+
+    ratios = skill_overlap_ratios(job_features[0]["skills"], cand_skills)
+    timed(results, "compute_match_score", n, lambda: [
+        compute_match_score(cand_embs[i], job_embs[0], ratios[i], resumes[i], job_texts[0])
+        for i in range(n)
+    ], args.repeat)
+
+    app = create_app()
+    with app.app_context():
+        def ingest():
+            ids = []
+            for start in range(0, n, 5000):
+                rows = [
+                    {
+                        "name": f"Candidate {i}",
+                        "email": f"candidate{i}@example.com",
+                        "resume_text": resumes[i],
+                        "skills_json": json.dumps(cand_skills[i]),
+                        "experience_years": exp_qual[i][0],
+                        "qualification": exp_qual[i][1],
+                        "embedding": encode_embedding(cand_embs[i]),
+                        "ingest_status": "done",
+                    }
+                    for i in range(start, min(n, start + 5000))
+                ]
+                batch_ids = db.session.execute(db.insert(Candidate).returning(Candidate.id, sort_by_parameter_order=True), rows).scalars().all()
+                add_candidate_skills(zip(batch_ids, cand_skills[start:start + len(rows)]))
+                db.session.commit()
+                ids += batch_ids
+            sync_candidate_index()
+            return ids
+        timed(results, "ingest_bulk_insert_and_index", n, ingest)
+
+        jobs = []
+        for text, features, emb in zip(job_texts, job_features, job_embs):
+            job = Job(title="Benchmark job", company="Bench", description=text,
+                      skills_required=json.dumps(features["skills"]), qualification=features["qualification"],
+                      experience_years=features["experience_years"], embedding=encode_embedding(emb))
+            db.session.add(job)
+            jobs.append(job)
+        db.session.commit()
+
+        timed(results, "shortlist_score_and_store", n * len(jobs),
+              lambda: [score_job_against_candidates(job) for job in jobs])
+        timed(results, "shortlist_first_page", len(jobs),
+              lambda: [ranking_page(job.id, 1) for job in jobs], args.repeat)
+
+        client = app.test_client()
+        def export():
+            size = 0
+            for job in jobs:
+                response = client.get(f"/download_results?job_id={job.id}")
+                size += sum(len(chunk) for chunk in response.response)
+            return size
+        size = timed(results, "download_results", n * len(jobs), export)
+        results["download_results"]["bytes"] = size
+        db.session.remove()
+        db.engine.dispose()
+    return results
+
+
+def compare(current, previous):
+    print(f"\nCompared with {previous.get('commit') or 'previous run'} (ratio > 1 means slower now):")
+    for size, benches in current["results"].items():
+        old = previous.get("results", {}).get(size, {})
+        for name, res in benches.items():
+            if name in old and old[name]["seconds"] > 0:
+                ratio = res["seconds"] / old[name]["seconds"]
+                flag = "  <-- regression" if ratio > 1.2 else ""
+                print(f"  n={size:<8}{name:<34}{ratio:>6.2f}x{flag}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--jobs", type=int, default=3, help="jobs to shortlist and export per size")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--repeat", type=int, default=3, help="runs per read-only step; the fastest is kept")
+    parser.add_argument("--database-url", help="empty database to use instead of a temp SQLite file")
+    parser.add_argument("--out", help="JSON results file (default data/bench/bench-<commit>.json)")
+    parser.add_argument("--compare", help="earlier results file to compare against")
+    parser.add_argument("--keep", action="store_true", help="keep the temporary databases")
+    args = parser.parse_args()
+
+    from app.utils import get_skill_map
+    seed_rows = load_seed_rows()
+    skill_map = get_skill_map()
+    commit = git_commit()
+    out = args.out or os.path.join(Config.DATA_DIR, "bench", f"bench-{commit or 'local'}.json")
+
+    report = {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "seed": args.seed,
+        "repeat": args.repeat,
+        "jobs": args.jobs,
+        "results": {},
+    }
+    work_dir = tempfile.mkdtemp(prefix="smartcv-bench-")
+    try:
+        for n in args.sizes:
+            print(f"n={n}")
+            report["results"][str(n)] = run_size(n, args, seed_rows, skill_map, work_dir)
+    finally:
+        if not args.keep:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    os.makedirs(os.path.dirname(os.path.abspath(out)), exist_ok=True)
+    with open(out, "w", encoding="utf8") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {out}")
+
+    if args.compare:
+        with open(args.compare, "r", encoding="utf8") as f:
+            compare(report, json.load(f))
@@ -0,0 +1,33 @@
+"""
+Precompute the fallback job catalog's embedding matrix (<csv>.embeddings.npy) and report
+how fast skill lookups against the catalog are.
+Usage: python -m scripts.build_job_catalog [--csv data/job_title_des.csv] [--skip-embeddings]
+"""
+import time, argparse
+from config import Config
+from app.job_catalog import JobCatalog
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--csv", default=Config.JOB_CATALOG_CSV)
+    parser.add_argument("--skip-embeddings", action="store_true")
+    parser.add_argument("--query", default="python, sql, machine learning")
+    args = parser.parse_args()
+
+    catalog = JobCatalog(args.csv)
+    t0 = time.perf_counter()
+    catalog.refresh()
+    print(f"Loaded {len(catalog.jobs)} jobs in {time.perf_counter() - t0:.2f}s")
+    if not catalog.jobs:
+        raise SystemExit(f"No jobs in {args.csv}")
+
+    if not args.skip_embeddings:
+        t0 = time.perf_counter()
+        shape = catalog.build_embeddings()
+        print(f"Saved {shape} embeddings to {catalog.embeddings_path} in {time.perf_counter() - t0:.1f}s")
+
+    n = 1000
+    t0 = time.perf_counter()
+    for _ in range(n):
+        results = catalog.search(args.query)
+    print(f"search({args.query!r}): {len(results)} jobs, {(time.perf_counter() - t0) / n * 1e6:.0f} µs per query")
@@ -0,0 +1,116 @@
+"""
+Bulk-import a directory of PDF/DOCX resumes as candidates.
+
+Text and feature extraction run across a process pool; each commit batch's texts go to
+embed_texts in one call, whose token-budgeted batching sorts them by length, and rows are
+written with bulk inserts. Every committed file is recorded in a progress log, so an
+interrupted run picks up where it stopped.
+Usage: python -m scripts.bulk_import <dir> [--workers 4] [--batch 256]
+"""
+import os, sys, json, time, argparse
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from config import Config
+from app import create_app, db
+from app.models import Candidate
+from app.utils import clean_text, extract_text_from_file, extract_name_email, extract_features, embed_texts, encode_embedding
+from app.vector_index import sync_candidate_index
+from app.skill_index import add_candidate_skills
+from app.scoring import refresh_stale_scores
+
+EXTENSIONS = (".pdf", ".docx")
+
+def find_resumes(root):
+    for dirpath, _, filenames in os.walk(root):
+        for name in sorted(filenames):
+            if name.lower().endswith(EXTENSIONS):
+                yield os.path.abspath(os.path.join(dirpath, name))
+
+def load_done(log_path):
+    done = set()
+    if os.path.exists(log_path):
+        with open(log_path, "r", encoding="utf8") as f:
+            for line in f:
+                try:
+                    done.add(json.loads(line)["path"])
+                except (ValueError, KeyError):
+                    continue
+    return done
+
+def extract(path):
+    """Runs in a worker process."""
+    text = clean_text(extract_text_from_file(path))
+    name, email = extract_name_email(text)
+    return path, text, clean_text(name), clean_text(email), extract_features(text)
+
+def embed_nonempty(texts):
+    """Embeddings for the non-empty texts (None for the rest); embed_texts plans the batches."""
+    out = [None] * len(texts)
+    idx = [i for i, t in enumerate(texts) if t]
+    if idx:
+        for i, emb in zip(idx, embed_texts([texts[i] for i in idx])):
+            out[i] = emb
+    return out
+
+def import_batch(extracted):
+    embs = embed_nonempty([e[1] for e in extracted])
+    rows = [
+        {
+            "name": name,
+            "email": email,
+            "resume_path": path,
+            "resume_text": text,
+            "skills_json": json.dumps(features["skills"]),
+            "qualification": features["qualification"],
+            "experience_years": features["experience_years"],
+            "embedding": encode_embedding(emb),
+            "ingest_status": "done",
+        }
+        for (path, text, name, email, features), emb in zip(extracted, embs)
+    ]
+    ids = db.session.execute(db.insert(Candidate).returning(Candidate.id, sort_by_parameter_order=True), rows).scalars().all()
+    add_candidate_skills(zip(ids, (e[4]["skills"] for e in extracted)))
+    db.session.commit()
+    return ids
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("directory")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--batch", type=int, default=256, help="files per commit")
+    parser.add_argument("--log", default=os.path.join(Config.DATA_DIR, "bulk_import_log.jsonl"))
+    parser.add_argument("--no-score", action="store_true", help="skip rescoring jobs at the end")
+    args = parser.parse_args()
+
+    done = load_done(args.log)
+    pending = [p for p in find_resumes(args.directory) if p not in done]
+    print(f"Found {len(pending) + len(done)} resumes, {len(done)} already imported, {len(pending)} to go")
+    if not pending:
+        sys.exit(0)
+
+    app = create_app()
+    start, imported = time.perf_counter(), 0
+    # spawn: workers must not inherit the app's DB engine or threads (as in app.ingest)
+    pool = ProcessPoolExecutor(max_workers=args.workers, mp_context=multiprocessing.get_context("spawn"))
+    with app.app_context(), pool, open(args.log, "a", encoding="utf8") as log:
+        results = pool.map(extract, pending, chunksize=8)
+        batch = []
+        for item in results:
+            batch.append(item)
+            if len(batch) < args.batch and imported + len(batch) < len(pending):
+                continue
+            ids = import_batch(batch)
+            for (path, *_), cand_id in zip(batch, ids):
+                log.write(json.dumps({"path": path, "candidate_id": cand_id}) + "\n")
+            log.flush()
+            imported += len(batch)
+            batch = []
+            elapsed = time.perf_counter() - start
+            print(f"[{imported}/{len(pending)}] {imported / elapsed:.1f} files/s")
+
+        sync_candidate_index()
+        if not args.no_score:
+            print(f"Rescored {refresh_stale_scores()} jobs")
+
+    elapsed = time.perf_counter() - start
+    print(f"Imported {imported} resumes in {elapsed:.1f}s ({imported / elapsed:.1f} files/s)")
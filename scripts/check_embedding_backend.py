@@ -0,0 +1,38 @@
+"""
+Compare embedding backends on CPU: load time, encode latency and agreement with the
+reference torch model. Texts come from AI_Resume_Screening_final.csv.
+Usage: python -m scripts.check_embedding_backend [--backends torch int8 onnx] [--n 256] [--threads 4]
+"""
+import os, time, argparse
+import pandas as pd
+from config import Config
+from app.embedding_backend import load_backend, verify_backend, set_threads
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--backends", nargs="+", default=["torch", "int8", "onnx"])
+    parser.add_argument("--n", type=int, default=256)
+    parser.add_argument("--threads", type=int, default=Config.EMBEDDING_THREADS)
+    args = parser.parse_args()
+    set_threads(args.threads)
+
+    df = pd.read_csv(os.path.join(Config.DATA_DIR, "AI_Resume_Screening_final.csv"), engine="python")
+    texts = df.fillna("").astype(str).agg(" ".join, axis=1).tolist()[:args.n]
+
+    reference = load_backend("torch")
+    for name in args.backends:
+        t0 = time.perf_counter()
+        try:
+            backend = reference if name == "torch" else load_backend(name)
+        except Exception as e:
+            print(f"{name:>6}: unavailable ({e})")
+            continue
+        load_s = time.perf_counter() - t0
+        backend.encode(texts[:8])
+        t0 = time.perf_counter()
+        backend.encode(texts)
+        per_text_ms = (time.perf_counter() - t0) / len(texts) * 1000
+        ok, report = verify_backend(backend, reference, texts[:64])
+        print(f"{name:>6}: load {load_s:.2f}s, {per_text_ms:.2f} ms/text, "
+              f"min cosine {report['min_cosine']}, max sim diff {report['max_similarity_diff']}, "
+              f"{'OK' if ok else 'OUTSIDE TOLERANCE'}")
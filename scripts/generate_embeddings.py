@@ -1,46 +1,222 @@
 """
 Generate embeddings for job descriptions and candidate resumes and save them.
-Outputs:
- - data/job_embeddings.pkl
- - data/candidate_embeddings.pkl
+Outputs (columnar artifacts, see app/artifacts.py):
+ - data/artifacts/jobs
+ - data/artifacts/candidates
+
+Generation is incremental. Each row's text is hashed together with the model name
+(app.cache.text_key) and only hashes that are not stored yet are encoded. New vectors
+go to fixed-size shards under data/embeddings/<jobs|candidates>/:
+ - shard-00000.npy   float32 vectors, at most --shard-size rows
+ - shard-00000.json  {"ids": [csv row numbers], "hashes": [...]}, written last
+A shard only counts once its manifest exists, so an interrupted run resumes after the
+last completed shard. The CSVs are streamed in chunks and at most one shard of texts is
+held for encoding at a time; the only per-row state is a 64-byte hash. The artifacts are
+then written by streaming the CSV a second time next to the vectors gathered from the shards.
+Vectors of rows that were edited or removed stay in their shards; --rebuild starts over.
+--from-pickle converts job_embeddings.pkl / candidate_embeddings.pkl from older runs
+into artifacts without encoding anything.
+Usage: python -m scripts.generate_embeddings [--only jobs|candidates] [--shard-size 4096]
+                                             [--rebuild] [--from-pickle]
 """
-import os, joblib, json
+import os, json, time, glob, shutil, argparse, joblib
 import pandas as pd
 import numpy as np
+from tqdm import tqdm
 from config import Config
-from sentence_transformers import SentenceTransformer
+from app.cache import text_key
+from app.artifacts import ArtifactWriter, artifact_path, merge_schema, write_artifact
+from app.embedding_backend import load_backend, encode_batched
+
+READ_CHUNK = 10_000
+
+
+def job_texts(df):
+    def col(*names):
+        for name in names:
+            if name in df.columns:
+                return df[name].fillna("").astype(str)
+        return pd.Series([""] * len(df), index=df.index)
+    return (col("title", "JobTitle") + ". " + col("description", "JobDesc")).str.strip().tolist()
+
+
+def resume_column(df):
+    """The resume text column: resume_text, else the first column of long strings (None = join all)."""
+    if 'resume_text' in df.columns:
+        return 'resume_text'
+    long_cols = [c for c in df.columns if df[c].dtype == object and df[c].str.len().mean() > 50]
+    return long_cols[0] if long_cols else None
+
+
+def candidate_texts(df, column):
+    if column is not None:
+        return df[column].fillna("").astype(str).tolist()
+    return df.fillna("").astype(str).agg(" ".join, axis=1).tolist()
+
+
+# ---------------------------------------------------------------
+# Shard store
+# ---------------------------------------------------------------
+class ShardStore:
+    """Append-only shards of vectors keyed by text hash."""
+
+    def __init__(self, root, dim):
+        self.root = root
+        self.dim = dim
+        os.makedirs(root, exist_ok=True)
+        self.hashes = []  # per completed shard: sorted hashes, and the row of each in the shard
+        self.order = []
+        self._vectors = {}
+        first = self._path(0, "npy")
+        if os.path.exists(first):
+            self.dim = np.load(first, mmap_mode="r").shape[1]
+        for path in sorted(glob.glob(os.path.join(root, "shard-*.json"))):
+            with open(path, encoding="utf8") as f:
+                hashes = np.asarray(json.load(f)["hashes"], dtype="S64")
+            order = np.argsort(hashes, kind="stable")
+            self.hashes.append(hashes[order])
+            self.order.append(order)
+
+    def __len__(self):
+        return sum(len(h) for h in self.hashes)
+
+    def _path(self, shard, ext):
+        return os.path.join(self.root, f"shard-{shard:05d}.{ext}")
+
+    def contains(self, hashes):
+        found = np.zeros(len(hashes), dtype=bool)
+        for sorted_hashes in self.hashes:
+            pos = np.minimum(np.searchsorted(sorted_hashes, hashes), len(sorted_hashes) - 1)
+            found |= sorted_hashes[pos] == hashes
+        return found
+
+    def write(self, vectors, ids, hashes):
+        shard = len(self.hashes)
+        np.save(self._path(shard, "npy"), np.asarray(vectors, dtype=np.float32))
+        tmp = self._path(shard, "json.tmp")
+        with open(tmp, "w", encoding="utf8") as f:
+            json.dump({"ids": [int(i) for i in ids], "hashes": list(hashes)}, f)
+        os.replace(tmp, self._path(shard, "json"))
+        hashes = np.asarray(hashes, dtype="S64")
+        order = np.argsort(hashes, kind="stable")
+        self.hashes.append(hashes[order])
+        self.order.append(order)
+
+    def gather(self, hashes):
+        """Vectors for hashes (all of which must be stored), in the given order."""
+        out = np.zeros((len(hashes), self.dim), dtype=np.float32)
+        for shard, sorted_hashes in enumerate(self.hashes):
+            pos = np.minimum(np.searchsorted(sorted_hashes, hashes), len(sorted_hashes) - 1)
+            hit = np.flatnonzero(sorted_hashes[pos] == hashes)
+            if len(hit):
+                if shard not in self._vectors:
+                    self._vectors[shard] = np.load(self._path(shard, "npy"), mmap_mode="r")
+                out[hit] = self._vectors[shard][self.order[shard][pos[hit]]]
+        return out
+
 
-model = SentenceTransformer(Config.EMBEDDING_MODEL)
+def generate(csv_path, store, model, model_key, texts_of, shard_size=4096, read_chunk=READ_CHUNK):
+    """
+    Encode the rows of csv_path whose hashes the store lacks, one shard at a time.
+    Returns (row hashes in CSV order, number of rows encoded, column schema).
+    """
+    row_hashes, encoded, schema = [], 0, {}
+    pending_ids, pending_texts, pending_hashes = [], [], {}
+
+    def flush():
+        nonlocal encoded
+        vectors = encode_batched(model, pending_texts)
+        store.write(vectors, pending_ids, list(pending_hashes))
+        encoded += len(pending_ids)
+        pending_ids.clear(); pending_texts.clear(); pending_hashes.clear()
+
+    started = time.perf_counter()
+    with tqdm(unit="row", desc=os.path.basename(csv_path)) as bar:
+        offset = 0
+        for chunk in pd.read_csv(csv_path, engine="python", chunksize=read_chunk):
+            merge_schema(schema, chunk)
+            texts = texts_of(chunk)
+            hashes = np.asarray([text_key(t, model_key) for t in texts], dtype="S64")
+            row_hashes.append(hashes)
+            for i in np.flatnonzero(~store.contains(hashes)):
+                key = hashes[i].decode()
+                if key in pending_hashes:
+                    continue
+                pending_hashes[key] = None
+                pending_ids.append(offset + int(i))
+                pending_texts.append(texts[i])
+                if len(pending_ids) >= shard_size:
+                    flush()
+            offset += len(chunk)
+            bar.update(len(chunk))
+            bar.set_postfix(encoded=encoded + len(pending_ids), stored=len(store))
+        if pending_ids:
+            flush()
+    elapsed = time.perf_counter() - started
+    total = sum(len(h) for h in row_hashes)
+    print(f"✅ {os.path.basename(csv_path)}: {total} rows, {encoded} encoded, {total - encoded} reused "
+          f"in {elapsed:.1f}s ({total / max(elapsed, 1e-9):.0f} rows/s, "
+          f"{encoded / max(elapsed, 1e-9):.0f} encoded/s)")
+    hashes = np.concatenate(row_hashes) if row_hashes else np.zeros(0, dtype="S64")
+    return hashes, encoded, schema
+
+
+def write_csv_artifact(name, csv_path, store, hashes, schema, read_chunk=READ_CHUNK):
+    """Stream csv_path into the artifact <name>, with each row's vector looked up by hash."""
+    writer = ArtifactWriter(artifact_path(name), len(hashes), store.dim, schema,
+                            model=Config.EMBEDDING_MODEL, source=os.path.abspath(csv_path))
+    offset = 0
+    for chunk in pd.read_csv(csv_path, engine="python", chunksize=read_chunk):
+        writer.append(chunk, store.gather(hashes[offset:offset + len(chunk)]))
+        offset += len(chunk)
+    return writer.close()
+
+
+def run(name, csv_path, model, model_key, texts_of, shard_size, rebuild=False):
+    root = os.path.join(Config.DATA_DIR, "embeddings", name)
+    if rebuild and os.path.isdir(root):
+        shutil.rmtree(root)
+    store = ShardStore(root, Config.EMBEDDING_DIM)
+    hashes, _, schema = generate(csv_path, store, model, model_key, texts_of, shard_size)
+    artifact = write_csv_artifact(name, csv_path, store, hashes, schema)
+    print("Saved", name, "embeddings to", artifact.root)
+
+
+def convert_pickle(name, pkl_path, csv_path):
+    d = joblib.load(pkl_path)
+    artifact = write_artifact(artifact_path(name), d['rows'], d['embeddings'], source=os.path.abspath(csv_path))
+    print(f"Converted {pkl_path} to {artifact.root} ({len(artifact)} rows)")
 
-def embed_texts(texts, chunk=256):
-    return model.encode(texts, show_progress_bar=True, convert_to_numpy=True)
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--only", choices=["jobs", "candidates"])
+    parser.add_argument("--shard-size", type=int, default=4096, help="vectors per shard")
+    parser.add_argument("--rebuild", action="store_true", help="discard stored shards and encode everything")
+    parser.add_argument("--from-pickle", action="store_true", help="convert the old .pkl outputs instead of encoding")
+    args = parser.parse_args()
+
     data_dir = Config.DATA_DIR
-    # Jobs
     jobs_path = os.path.join(data_dir, "job_title_des.csv")
-    dfj = pd.read_csv(jobs_path, engine="python")
-    ttexts = []
-    for _, r in dfj.iterrows():
-        title = str(r.get('title') or r.get('JobTitle') or "")
-        desc = str(r.get('description') or r.get('JobDesc') or "")
-        ttexts.append((title + ". " + desc).strip())
-    job_embs = embed_texts(ttexts)
-    job_out = os.path.join(data_dir, "job_embeddings.pkl")
-    joblib.dump({"rows": dfj, "embeddings": job_embs}, job_out)
-    print("Saved job embeddings to", job_out)
+    resumes_path = os.path.join(data_dir, "AI_Resume_Screening_final.csv")
+
+    if args.from_pickle:
+        if args.only in (None, "jobs"):
+            convert_pickle("jobs", os.path.join(data_dir, "job_embeddings.pkl"), jobs_path)
+        if args.only in (None, "candidates"):
+            convert_pickle("candidates", os.path.join(data_dir, "candidate_embeddings.pkl"), resumes_path)
+        raise SystemExit(0)
+
+    model = load_backend()
+    model_key = f"{Config.EMBEDDING_MODEL}:{model.name}"
+
+    # Jobs
+    if args.only in (None, "jobs"):
+        run("jobs", jobs_path, model, model_key, job_texts, args.shard_size, args.rebuild)
 
     # Candidates
-    resumes_path = os.path.join(data_dir, "AI_Resume_Screening_final.csv")
-    dfr = pd.read_csv(resumes_path, engine="python")
-    # find resume text column
-    if 'resume_text' in dfr.columns:
-        texts = dfr['resume_text'].fillna("").tolist()
-    else:
-        # attempt to find long text column
-        candidate_cols = [c for c in dfr.columns if dfr[c].dtype == object and dfr[c].str.len().mean() > 50]
-        texts = dfr[candidate_cols[0]].fillna("").tolist() if candidate_cols else dfr.astype(str).agg(" ".join, axis=1).tolist()
-    cand_embs = embed_texts(texts)
-    cand_out = os.path.join(data_dir, "candidate_embeddings.pkl")
-    joblib.dump({"rows": dfr, "embeddings": cand_embs}, cand_out)
-    print("Saved candidate embeddings to", cand_out)
+    if args.only in (None, "candidates"):
+        # the resume text column is picked from the first chunk and kept for the whole file
+        column = resume_column(next(iter(pd.read_csv(resumes_path, engine="python", chunksize=READ_CHUNK))))
+        run("candidates", resumes_path, model, model_key, lambda df: candidate_texts(df, column),
+            args.shard_size, args.rebuild)
@@ -1,39 +1,42 @@
 """
 Demo: given a job row index and top-K, show best candidates using saved embeddings + matcher.
+All candidates are featurized together and scored with a single matcher.predict call.
 """
-import os, joblib, numpy as np
+import os, numpy as np
 from config import Config
-from sklearn.metrics.pairwise import cosine_similarity
+from app.artifacts import open_artifact
+from app.matcher import Matcher, job_token_set, token_set, token_overlap_ratios
 
 data_dir = Config.DATA_DIR
-jobdb = joblib.load(os.path.join(data_dir,"job_embeddings.pkl"))
-candb = joblib.load(os.path.join(data_dir,"candidate_embeddings.pkl"))
-matcher = joblib.load(os.path.join(data_dir,"matcher_rf.pkl"))
+jobs = open_artifact("jobs")
+cands = open_artifact("candidates")
+matcher = Matcher(os.path.join(data_dir,"matcher_rf.pkl"))
 
-job_rows = jobdb['rows']
-job_embs = jobdb['embeddings']
-cand_rows = candb['rows']
-cand_embs = candb['embeddings']
+job_embs = jobs.embeddings
+cand_embs = cands.embeddings
 
-def score_pair(jidx, cidx):
-    emb_sim = float(cosine_similarity([job_embs[jidx]],[cand_embs[cidx]])[0,0])
+if cands.has_column('resume_text'):
+    cand_texts = cands.column('resume_text')
+else:
+    cand_texts = cands.frame().fillna("").astype(str).agg(" ".join, axis=1).tolist()
+cand_tokens = [token_set(t) for t in cand_texts]
+cand_norm = np.asarray(cand_embs, dtype=np.float32)
+cand_norm = cand_norm / np.maximum(np.linalg.norm(cand_norm, axis=1, keepdims=True), 1e-12)
+
+def score_job(jidx):
+    """(scores, emb_sims, skill_ratios) of every candidate for one job."""
+    job_emb = np.asarray(job_embs[jidx], dtype=np.float32)
+    emb_sim = cand_norm @ (job_emb / max(float(np.linalg.norm(job_emb)), 1e-12))
     # naive skill ratio approximated by token overlap
-    job_text = str((job_rows.iloc[jidx].get('title') or "") + " " + (job_rows.iloc[jidx].get('description') or ""))
-    cand_text = str((cand_rows.iloc[cidx].get('resume_text') or "") if 'resume_text' in cand_rows.columns else cand_rows.iloc[cidx].astype(str).agg(" ".join))
-    job_tokens = set(job_text.lower().split()[:200])
-    cand_tokens = set(cand_text.lower().split()[:200])
-    overlap = len(job_tokens.intersection(cand_tokens))
-    skill_ratio = overlap / max(1, len(job_tokens))
-    features = [[emb_sim, skill_ratio]]
-    score = matcher.predict(features)[0]
-    return score, emb_sim, skill_ratio
+    title = jobs.text('title', jidx) if jobs.has_column('title') else None
+    description = jobs.text('description', jidx) if jobs.has_column('description') else None
+    job_tokens = job_token_set(title, description)
+    skill_ratio = token_overlap_ratios(job_tokens, cand_tokens)
+    return matcher.predict(emb_sim, skill_ratio), emb_sim, skill_ratio
 
 if __name__ == "__main__":
     jidx = 0
-    scores = []
-    for ci in range(len(cand_embs)):
-        s, e, k = score_pair(jidx, ci)
-        scores.append((ci, s, e, k))
-    scores_sorted = sorted(scores, key=lambda x: x[1], reverse=True)[:20]
-    for ci, s, e, k in scores_sorted:
-        print(f"Candidate idx {ci}, score {s:.4f}, emb_sim {e:.4f}, skill_ratio {k:.4f}")
+    scores, emb_sim, skill_ratio = score_job(jidx)
+    top = np.argsort(-scores, kind="stable")[:20]
+    for ci in top:
+        print(f"Candidate idx {ci}, score {scores[ci]:.4f}, emb_sim {emb_sim[ci]:.4f}, skill_ratio {skill_ratio[ci]:.4f}")
@@ -1,6 +1,33 @@
+"""
+Create the database tables, and bring tables from older versions up to date by adding
+any missing columns and indexes declared on the models. An empty candidate_skills
+table is filled from the stored candidates.
+"""
 from app import create_app, db
+from app.models import Candidate, CandidateSkill
+from app.skill_index import rebuild_skill_index
 
-app = create_app()
-with app.app_context():
-    db.create_all()
-    print("Database tables created.")
+def upgrade_schema():
+    """ALTER TABLE ... ADD COLUMN / CREATE INDEX for anything missing from the live tables."""
+    inspector = db.inspect(db.engine)
+    for table in db.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        existing = {c["name"] for c in inspector.get_columns(table.name)}
+        with db.engine.begin() as conn:
+            for col in table.columns:
+                if col.name not in existing:
+                    col_type = col.type.compile(dialect=db.engine.dialect)
+                    conn.execute(db.text(f"ALTER TABLE {table.name} ADD COLUMN {col.name} {col_type}"))
+                    print(f"Added column {table.name}.{col.name}")
+        for index in table.indexes:
+            index.create(db.engine, checkfirst=True)
+
+if __name__ == "__main__":
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        upgrade_schema()
+        if not db.session.query(CandidateSkill.query.exists()).scalar() and Candidate.query.first():
+            print(f"Indexed skills of {rebuild_skill_index()} candidates")
+        print("Database tables created.")
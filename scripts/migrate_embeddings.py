@@ -0,0 +1,55 @@
+"""
+Convert stored embeddings from the old pickled-JSON format to the compact binary encoding.
+Rows already in the new format are skipped, so the script can be re-run safely.
+Usage: python -m scripts.migrate_embeddings [--dtype float16] [--batch 500]
+"""
+import argparse, time
+from app import create_app, db
+from app.models import Candidate, Job
+from app.utils import encode_embedding, decode_embedding, is_encoded_embedding
+from scripts.init_db import upgrade_schema
+
+def migrate(model, dtype, batch):
+    converted = skipped = bytes_before = bytes_after = 0
+    last_id = 0
+    while True:
+        rows = db.session.execute(
+            db.select(model.id, model.embedding)
+            .where(model.id > last_id, model.embedding.isnot(None))
+            .order_by(model.id)
+            .limit(batch)
+        ).all()
+        if not rows:
+            break
+        updates = []
+        for row_id, blob in rows:
+            if is_encoded_embedding(blob) and dtype is None:
+                skipped += 1
+                continue
+            new_blob = encode_embedding(decode_embedding(blob), dtype=dtype)
+            bytes_before += len(blob)
+            bytes_after += len(new_blob)
+            updates.append({"id": row_id, "embedding": new_blob})
+            if model is Job:
+                # running apps reload their recommendation matrix (app.job_index)
+                updates[-1]["features_updated_at"] = time.time()
+        if updates:
+            db.session.execute(db.update(model), updates)
+            db.session.commit()
+            converted += len(updates)
+        last_id = rows[-1][0]
+    print(f"{model.__tablename__}: converted {converted}, skipped {skipped}, "
+          f"{bytes_before} -> {bytes_after} bytes")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--dtype", choices=["float32", "float16"], default=None,
+                        help="re-encode every row with this dtype (default: Config.EMBEDDING_DTYPE, legacy rows only)")
+    parser.add_argument("--batch", type=int, default=500)
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        upgrade_schema()
+        for model in (Candidate, Job):
+            migrate(model, args.dtype, args.batch)
@@ -0,0 +1,54 @@
+"""
+Local stand-in for the Naukri search pages, for exercising app.crawler without the network.
+Serves saved HTML from data/crawler_fixtures: /<slug>.html if present, otherwise
+default-<page>.html for "...-jobs-in-<loc>-<page>" paths and default.html for page 1.
+Usage: python -m scripts.stub_job_server [--port 8765] [--delay 0.2]
+       CRAWLER_BASE_URL=http://127.0.0.1:8765 python run.py
+"""
+import os, re, time, argparse
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from config import Config
+
+FIXTURES = os.path.join(Config.DATA_DIR, "crawler_fixtures")
+
+def fixture_for(path):
+    slug = path.strip("/").split("?")[0]
+    exact = os.path.join(FIXTURES, slug + ".html")
+    if slug and os.path.exists(exact):
+        return exact
+    m = re.search(r"-jobs-in-[^/]*?-(\d+)$", slug)
+    paged = os.path.join(FIXTURES, f"default-{m.group(1)}.html") if m else None
+    if paged and os.path.exists(paged):
+        return paged
+    return None if m else os.path.join(FIXTURES, "default.html")
+
+def make_handler(delay):
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"  # keep-alive, like the real site
+
+        def do_GET(self):
+            time.sleep(delay)
+            path = fixture_for(self.path)
+            if path is None:
+                body, status = b"<html><body>No more results</body></html>", 404
+            else:
+                with open(path, "rb") as f:
+                    body, status = f.read(), 200
+            self.send_response(status)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, fmt, *args):
+            print("stub:", fmt % args)
+    return Handler
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--delay", type=float, default=0.0, help="seconds of simulated latency per request")
+    args = parser.parse_args()
+    server = ThreadingHTTPServer(("127.0.0.1", args.port), make_handler(args.delay))
+    print(f"Serving {FIXTURES} on http://127.0.0.1:{args.port}")
+    server.serve_forever()
@@ -2,57 +2,124 @@
 Train a simple model that predicts match score between job and candidate.
 Features:
  - cosine similarity between embeddings
- - skill overlap ratio
+ - skill overlap ratio (shared words among the first 200 tokens of each text)
 Labeling: if your dataset has a 'label' column (matched=1), train supervised; otherwise create proxy label using cosine>threshold.
+
+Jobs and candidates come from the artifacts written by scripts/generate_embeddings.py
+(data/artifacts/jobs, data/artifacts/candidates); only the text columns used are read.
+Pair features are built in batches: every text is tokenized once, all similarities come
+from one matmul of the normalized embedding matrices per block of jobs, and token overlaps
+from a product of sparse binary bag-of-words matrices.
+Usage: python -m scripts.train_matcher [--jobs 200] [--candidates 500] [--max-pairs 0]
+       (0 for --jobs / --candidates means all rows)
 """
-import os, joblib, numpy as np, pandas as pd
+import os, time, argparse, joblib, numpy as np, pandas as pd
+from scipy import sparse
 from config import Config
+from app.artifacts import open_artifact
 from sklearn.ensemble import RandomForestRegressor
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import mean_squared_error, r2_score
-from sklearn.metrics.pairwise import cosine_similarity
 
 data_dir = Config.DATA_DIR
+TOKEN_LIMIT = 200
+
+def load_embeddings(name, limit=0, columns=None):
+    """(row metadata DataFrame, embeddings) of the first `limit` rows (0 = all) of an artifact."""
+    art = open_artifact(name)
+    n = min(limit or len(art), len(art))
+    return art.frame(columns, rows=slice(0, n)), art.embeddings[:n]
+
+def job_texts(df):
+    title = df['title'].fillna("").astype(str) if 'title' in df.columns else pd.Series([""] * len(df), index=df.index)
+    desc = df['description'].fillna("").astype(str) if 'description' in df.columns else pd.Series([""] * len(df), index=df.index)
+    return (title + " " + desc).tolist()
+
+def candidate_texts(df):
+    if 'resume_text' in df.columns:
+        return df['resume_text'].fillna("").astype(str).tolist()
+    return df.fillna("").astype(str).agg(" ".join, axis=1).tolist()
+
+def token_sets(texts, limit=TOKEN_LIMIT):
+    return [set(t.lower().split()[:limit]) for t in texts]
+
+def binary_bow(sets, vocab):
+    """CSR matrix with a 1 for every (text, token) pair; tokens missing from vocab are dropped."""
+    indptr, indices = [0], []
+    for tokens in sets:
+        indices.extend(vocab[t] for t in tokens if t in vocab)
+        indptr.append(len(indices))
+    data = np.ones(len(indices), dtype=np.int32)
+    return sparse.csr_matrix((data, indices, indptr), shape=(len(sets), len(vocab)))
+
+def normalize_rows(matrix):
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
+
+def pair_features(job_embs, cand_embs, job_texts_, cand_texts_, max_pairs=0, block_pairs=4_000_000, seed=42):
+    """
+    Features for every (job, candidate) pair, row-major by job: (X, job_idx, cand_idx).
+    With max_pairs, a uniform random sample of about that many pairs is kept.
+    """
+    job_sets, cand_sets = token_sets(job_texts_), token_sets(cand_texts_)
+    # only job tokens can contribute to the overlap, so they are the whole vocabulary
+    vocab = {}
+    for tokens in job_sets:
+        for t in tokens:
+            vocab.setdefault(t, len(vocab))
+    job_bow = binary_bow(job_sets, vocab)
+    cand_bow_t = binary_bow(cand_sets, vocab).T.tocsc()
+    job_sizes = np.maximum(1, np.asarray([len(s) for s in job_sets], dtype=np.float32))
 
-def load_embeddings(file):
-    d = joblib.load(file)
-    return d['rows'], d['embeddings']
+    jn, cn = normalize_rows(job_embs), normalize_rows(cand_embs)
+    n_jobs, n_cands = len(jn), len(cn)
+    keep = min(1.0, max_pairs / (n_jobs * n_cands)) if max_pairs else 1.0
+    rng = np.random.default_rng(seed)
+    step = max(1, block_pairs // max(1, n_cands))
+
+    feats, job_idx, cand_idx = [], [], []
+    for start in range(0, n_jobs, step):
+        stop = min(n_jobs, start + step)
+        emb_sim = jn[start:stop] @ cn.T
+        overlap = (job_bow[start:stop] @ cand_bow_t).toarray().astype(np.float32)
+        skill_ratio = overlap / job_sizes[start:stop, None]
+        ji, ci = np.divmod(np.arange((stop - start) * n_cands), n_cands)
+        if keep < 1.0:
+            mask = rng.random(len(ji)) < keep
+            ji, ci = ji[mask], ci[mask]
+        feats.append(np.column_stack([emb_sim[ji, ci], skill_ratio[ji, ci]]))
+        job_idx.append(ji + start)
+        cand_idx.append(ci)
+    if not feats:
+        return np.zeros((0, 2), dtype=np.float32), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+    return np.vstack(feats), np.concatenate(job_idx), np.concatenate(cand_idx)
 
 if __name__ == "__main__":
-    jobs_df, job_embs = load_embeddings(os.path.join(data_dir,"job_embeddings.pkl"))
-    cands_df, cand_embs = load_embeddings(os.path.join(data_dir,"candidate_embeddings.pkl"))
-
-    X = []
-    y = []
-    # create sample dataset by pairing every job with some candidates (for demo, pair first 200 x first 200)
-    max_j = min(200, len(job_embs))
-    max_c = min(500, len(cand_embs))
-    for ji in range(max_j):
-        for ci in range(max_c):
-            emb_sim = float(cosine_similarity([job_embs[ji]],[cand_embs[ci]])[0,0])
-            # skill overlap proxy:
-            # attempt to extract skills from text using simple token matching
-            job_text = str((jobs_df.iloc[ji].get('title') or "") + " " + (jobs_df.iloc[ji].get('description') or ""))
-            cand_text = str((cands_df.iloc[ci].get('resume_text') or "") if 'resume_text' in cands_df.columns else cands_df.iloc[ci].astype(str).agg(" ".join))
-            # naive skill score: fraction of shared words in top 200 tokens
-            job_tokens = set(job_text.lower().split()[:200])
-            cand_tokens = set(cand_text.lower().split()[:200])
-            overlap = len(job_tokens.intersection(cand_tokens))
-            skill_ratio = overlap / max(1, len(job_tokens))
-            X.append([emb_sim, skill_ratio])
-            # proxy label: higher if emb_sim high and skill_ratio high
-            label = 0.7*emb_sim + 0.3*skill_ratio
-            y.append(label)
-    X = np.array(X)
-    y = np.array(y)
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--jobs", type=int, default=200, help="first N jobs to pair (0 = all)")
+    parser.add_argument("--candidates", type=int, default=500, help="first N candidates to pair (0 = all)")
+    parser.add_argument("--max-pairs", type=int, default=0, help="random sample of about this many pairs (0 = all)")
+    parser.add_argument("--n-estimators", type=int, default=200)
+    args = parser.parse_args()
+
+    jobs_df, job_embs = load_embeddings("jobs", args.jobs, ["title", "description"])
+    cand_columns = ["resume_text"] if open_artifact("candidates").has_column("resume_text") else None
+    cands_df, cand_embs = load_embeddings("candidates", args.candidates, cand_columns)
+
+    max_j, max_c = len(job_embs), len(cand_embs)
+    t0 = time.perf_counter()
+    X, _, _ = pair_features(job_embs, cand_embs, job_texts(jobs_df), candidate_texts(cands_df),
+                            max_pairs=args.max_pairs)
+    # proxy label: higher if emb_sim high and skill_ratio high
+    y = 0.7 * X[:, 0] + 0.3 * X[:, 1]
+    print(f"Built {len(X)} pair features ({max_j} jobs x {max_c} candidates) in {time.perf_counter() - t0:.2f}s")
+
     X_train, X_test, y_train, y_test = train_test_split(X,y, test_size=0.2, random_state=42)
-    rf = RandomForestRegressor(n_estimators=200, random_state=42)
+    rf = RandomForestRegressor(n_estimators=args.n_estimators, random_state=42, n_jobs=-1)
     rf.fit(X_train, y_train)
     preds = rf.predict(X_test)
-    print("RMSE:", mean_squared_error(y_test, preds, squared=False))
+    print("RMSE:", float(np.sqrt(mean_squared_error(y_test, preds))))
     print("R2:", r2_score(y_test, preds))
     joblib.dump(rf, os.path.join(data_dir, "matcher_rf.pkl"))
     print("Saved matcher model.")
-
-
-